@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+
+from .TermSplitter import TermSplitter
+
+
+class ClosedFormNormalizer(object):
+    """
+    ClosedFormNormalizer object that brings expressions of the form sum of
+    polynomial(n) * root^n into a canonical form. This is the shape of every general
+    and closed form solution, so it replaces sympy's generic simplify() which tries
+    many heuristics and is by far the most expensive step of solving.
+    """
+
+    def __init__(self, n):
+        """
+        create ClosedFormNormalizer object
+
+        Args:
+            n (sympy symbol): The variable of the expressions
+        """
+        self._n = n
+        self._splitter = TermSplitter(n)
+
+    def _normalizeConstant(self, expr):
+        """
+        Bring a constant into a canonical form by rationalizing the denominator and
+        combining the rational coefficients of every radical
+
+        Args:
+            expr (sympy expression): The constant
+
+        Returns:
+            sympy expression: The canonical constant
+        """
+        return sympy.expand(sympy.radsimp(sympy.expand(expr)))
+
+    def collect(self, expr):
+        """
+        Collect the terms of an expression per base and power of n
+
+        Args:
+            expr (sympy expression): The expression to collect
+
+        Returns:
+            tuple(sympy expression, dict of sympy expr: dict of int: sympy expr): The terms that are not of the
+                form constant * n^degree * base^n and per normalized base the coefficient of every power of n
+        """
+        # contains per base the coefficient of every power of n
+        buckets = {}
+        other = sympy.Integer(0)
+        for term in sympy.Add.make_args(sympy.expand(expr)):
+            split = self._splitter.split(term)
+            if split is None:
+                other += term
+                continue
+
+            base, degree, constant = split
+            polys = buckets.setdefault(self._normalizeConstant(base), {})
+            polys[degree] = polys.get(degree, 0) + constant
+
+        return other, buckets
+
+    def combine(self, collected, coefficients):
+        """
+        Normalize a linear combination of collected expressions. Only the combined coefficients
+        are normalized, the bases were already normalized when the expressions were collected.
+
+        Args:
+            collected (list of tuple): The expressions as returned by collect
+            coefficients (list of sympy expr): The coefficient of every expression
+
+        Returns:
+            sympy expression: The normalized linear combination
+        """
+        n = self._n
+
+        buckets = {}
+        other = sympy.Integer(0)
+        for (o, b), coefficient in zip(collected, coefficients):
+            other += coefficient * o
+            for base, polys in b.items():
+                combined = buckets.setdefault(base, {})
+                for d, c in polys.items():
+                    combined[d] = combined.get(d, 0) + coefficient * c
+
+        terms = [other]
+        for base, polys in buckets.items():
+            poly = sum(self._normalizeConstant(c) * n**d for d, c in polys.items())
+            if poly != 0:
+                terms.append(poly * base**n)
+
+        return sympy.Add(*terms)
+
+    def normalize(self, expr):
+        """
+        Normalize an expression by collecting the terms per base, combining the
+        coefficients of every power of n and rationalizing the radicals
+
+        Args:
+            expr (sympy expression): The expression to normalize
+
+        Returns:
+            sympy expression: The normalized expression
+        """
+        return self.combine([self.collect(expr)], [sympy.Integer(1)])
+
+    def simplify(self, expr, pretty = False):
+        """
+        Simplify an expression
+
+        Args:
+            expr (sympy expression): The expression to simplify
+            pretty (bool): Also run sympy's generic simplify() on the normalized expression
+
+        Returns:
+            sympy expression: The simplified expression
+        """
+        expr = self.normalize(expr)
+        if pretty:
+            expr = expr.simplify()
+
+        return expr
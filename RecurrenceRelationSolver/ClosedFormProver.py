@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+from sympy.polys.constructor import construct_domain
+
+from .TermSplitter import TermSplitter
+
+
+class ClosedFormProver(object):
+    """
+    ClosedFormProver object that proves that a closed form satisfies a recurrence. The closed
+    form is substituted into the recurrence and the residual is written as a sum of terms
+    c * n^d * b^n. Such terms with distinct (b, d) are linearly independent functions of n,
+    so the residual vanishes for every n exactly when every coefficient c is zero. The
+    coefficients are algebraic numbers and are tested for zero exactly.
+    """
+
+    def __init__(self, recurrence, s, n):
+        """
+        create ClosedFormProver object
+
+        Args:
+            recurrence (sympy expression): The right hand side of the recurrence
+            s (sympy Function): The function of the recurrence
+            n (sympy Symbol): The variable of the recurrence
+        """
+        self._recurrence = recurrence
+        self._s = s
+        self._n = n
+        self._splitter = TermSplitter(n)
+
+    def isZero(self, value):
+        """
+        Test whether a constant is zero exactly
+
+        Args:
+            value (sympy expression): The constant
+
+        Returns:
+            bool: True if it is zero, False if it isn't, None if that can't be decided
+        """
+        value = sympy.expand(value)
+        if value.is_Rational:
+            return value == 0
+        if value.free_symbols:
+            return None
+
+        # A value that is clearly away from zero numerically isn't zero, evalf bounds its error
+        approximation = value.evalf(30)
+        if approximation.is_Number and abs(approximation) > sympy.Float("1e-20"):
+            return False
+
+        # The field spanned by several roots that are only known as CRootOf is far too large to compute in
+        if len(value.atoms(sympy.CRootOf)) > 1:
+            return None
+
+        # In the algebraic number field spanned by the value the zero test is exact
+        try:
+            domain, (element,) = construct_domain([value], extension = True)
+        except (NotImplementedError, sympy.PolynomialError, sympy.CoercionFailed):
+            return None
+        if domain.is_EX:
+            return None
+        return not element
+
+    def _coefficients(self, residual):
+        """
+        Group the residual into terms c * n^d * b^n
+
+        Args:
+            residual (sympy expression): The residual
+
+        Returns:
+            dict of tuple(sympy expr, int): sympy expr: The coefficient c per (b, d), None if the
+                                                        residual isn't a sum of such terms
+        """
+        coefficients = {}
+        expanded = sympy.expand(residual, power_base = False, power_exp = True, mul = True, multinomial = True)
+        for term in sympy.Add.make_args(expanded):
+            split = self._splitter.split(term)
+            if split is None:
+                return None
+            base, degree, constant = split
+            # Bases that are written differently but are equal belong to the same function of n
+            for b, d in coefficients:
+                if d != degree:
+                    continue
+                equal = True if b == base else self.isZero(b - base)
+                if equal is None:
+                    return None
+                if equal:
+                    base = b
+                    break
+            coefficients[(base, degree)] = coefficients.get((base, degree), sympy.Integer(0)) + constant
+
+        return coefficients
+
+    def isSolution(self, closedForm):
+        """
+        Test whether the closed form satisfies the recurrence for every n
+
+        Args:
+            closedForm (sympy expression): The closed form
+
+        Returns:
+            bool: True if it is proven, False if it is disproven, None if that can't be decided
+        """
+        n = self._n
+        shifted = { f: closedForm.subs(n, f.args[0]) for f in self._recurrence.atoms(self._s) }
+        residual = closedForm - self._recurrence.xreplace(shifted)
+
+        coefficients = self._coefficients(residual)
+        if coefficients is None:
+            return None
+
+        proven = True
+        for coefficient in coefficients.values():
+            zero = self.isZero(coefficient)
+            if zero is False:
+                return False
+            if zero is None:
+                proven = None
+
+        return proven
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# coding=utf-8
+from fractions import Fraction
+
+
+class CompanionMatrix(object):
+    """
+    CompanionMatrix object that evaluates a linear recurrence relation with constant
+    rational coefficients at an arbitrary index by exponentiating its companion matrix.
+    Non homogeneous terms of the form c * n^d * b^n are handled by augmenting the state
+    vector with the values of n^d * b^n.
+    """
+
+    def __init__(self, coefficients, nonHomogeneousTerms):
+        """
+        create CompanionMatrix object
+
+        Args:
+            coefficients (list of int/Fraction): The coefficient of s(n-i) at position i - 1
+            nonHomogeneousTerms (dict of (int/Fraction, int): int/Fraction): The non homogeneous terms
+                                                                            in the form (base, degree): constant
+        """
+        self._degree = len(coefficients)
+
+        # For every base we keep track of n^0 * b^n up to n^d * b^n where d is the highest degree
+        # that occurs for that base. The state vector at index i is laid out as:
+        # s(i), s(i-1), ..., s(i-k+1), followed by (i+1)^d * b^(i+1) for every base and degree.
+        highestDegrees = {}
+        for (base, degree) in nonHomogeneousTerms:
+            highestDegrees[base] = max(degree, highestDegrees.get(base, 0))
+
+        self._bases = sorted(highestDegrees.items())
+        size = self._degree + sum(d + 1 for b, d in self._bases)
+
+        matrix = [[0] * size for _ in range(size)]
+
+        # s(i+1) = c_1 * s(i) + ... + c_k * s(i-k+1) + F(i+1)
+        for j, c in enumerate(coefficients):
+            matrix[0][j] = c
+
+        # shift the previous values down
+        for j in range(1, self._degree):
+            matrix[j][j - 1] = 1
+
+        offset = self._degree
+        for base, highest in self._bases:
+            for d in range(0, highest + 1):
+                matrix[0][offset + d] = nonHomogeneousTerms.get((base, d), 0)
+
+                # (i+2)^d * b^(i+2) = b * sum_e C(d, e) * (i+1)^e * b^(i+1)
+                binomial = 1
+                for e in range(0, d + 1):
+                    matrix[offset + d][offset + e] = base * binomial
+                    binomial = binomial * (d - e) // (e + 1)
+
+            offset += highest + 1
+
+        self._size = size
+
+        # Cached squares of the matrix, _squares[i] contains M^(2^i)
+        self._squares = [matrix]
+
+    def _multiply(self, a, b):
+        """
+        Multiply two square matrices
+
+        Args:
+            a (list of list of int/Fraction): left hand side
+            b (list of list of int/Fraction): right hand side
+
+        Returns:
+            list of list of int/Fraction: The product
+        """
+        columns = list(zip(*b))
+        return [[sum(x * y for x, y in zip(row, column) if x and y) for column in columns] for row in a]
+
+    def _apply(self, matrix, vector):
+        """
+        Multiply a matrix with a column vector
+
+        Args:
+            matrix (list of list of int/Fraction): The matrix
+            vector (list of int/Fraction): The vector
+
+        Returns:
+            list of int/Fraction: The product
+        """
+        return [sum(x * y for x, y in zip(row, vector) if x and y) for row in matrix]
+
+    def initialState(self, start, values):
+        """
+        Build the state vector for a given index
+
+        Args:
+            start (int): The index of the newest value
+            values (list of int/Fraction): The values s(start), s(start-1), ..., s(start-k+1)
+
+        Returns:
+            list of int/Fraction: The state vector
+        """
+        state = list(values)
+        nextIndex = start + 1
+        for base, highest in self._bases:
+            power = Fraction(base) ** nextIndex
+            if power.denominator == 1:
+                power = power.numerator
+            state.extend(nextIndex**d * power for d in range(0, highest + 1))
+
+        return state
+
+    def advance(self, state, steps):
+        """
+        Advance a state vector by a number of steps using repeated squaring
+
+        Args:
+            state (list of int/Fraction): The state vector
+            steps (int): The amount of steps to advance
+
+        Returns:
+            list of int/Fraction: The advanced state vector
+        """
+        bit = 0
+        while steps:
+            if bit == len(self._squares):
+                last = self._squares[-1]
+                self._squares.append(self._multiply(last, last))
+
+            if steps & 1:
+                state = self._apply(self._squares[bit], state)
+
+            steps >>= 1
+            bit += 1
+
+        return state
+
+    def valueAt(self, n, start, values):
+        """
+        Get the nth value of the recurrence relation
+
+        Args:
+            n (int): The nth value to calculate, must be at least start
+            start (int): The index of the newest known value
+            values (list of int/Fraction): The known values s(start), s(start-1), ..., s(start-k+1)
+
+        Returns:
+            int/Fraction: The result
+        """
+        return self.advance(self.initialState(start, values), n - start)[0]
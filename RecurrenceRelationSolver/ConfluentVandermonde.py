@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+from sympy.polys.constructor import construct_domain
+from sympy.polys.polyerrors import CoercionFailed
+
+
+class ConfluentVandermonde(object):
+    """
+    ConfluentVandermonde object that solves the system of equations for the coefficients
+    of the general solution sum_i sum_j p_i_j * n^j * r_i^n of a homogeneous recurrence
+    from values at consecutive indices. This system is a confluent Vandermonde system in
+    the roots r_i, it is solved in O(k^2) field operations through the generating function
+    of the sequence and its partial fraction decomposition. The coefficients of a root only
+    depend on that root, so all arithmetic is exact in the field spanned by the radical roots
+    and the values, roots that are only known as CRootOf are handled in a field of their own.
+    The solution is linear in the values, so the system is solved once for every unit vector
+    and solving for values is a linear combination of those solutions.
+    """
+
+    def __init__(self, coefficients, roots, start):
+        """
+        create ConfluentVandermonde object
+
+        Args:
+            coefficients (tuple of sympy expr): The coefficient of s(n-i) at position i - 1
+            roots (list of tuple(sympy expr, int)): The roots of the characteristic equation
+                                                    with their multiplicities
+            start (int): The first of the consecutive indices of the values
+        """
+        self._coefficients = list(coefficients)
+        self._roots = roots
+        self._start = start
+
+        # The field spanned by all CRootOf roots is far too large to compute in
+        radical = [i for i, (r, _) in enumerate(roots) if not isinstance(r, sympy.CRootOf)]
+        self._groups = ([radical] if radical else []) + [[i] for i in range(0, len(roots)) if i not in radical]
+
+        # Contains per group the field and per coefficient its solution for every unit vector,
+        # in the field and as sympy expressions
+        self._maps = None
+
+    def _convert(self, roots):
+        """
+        Convert the roots and the coefficients into elements of a field that contains them both
+
+        Args:
+            roots (list of sympy expr): The roots
+
+        Returns:
+            tuple(sympy domain, list of domain elements, list of domain elements): The field, the roots and the coefficients
+        """
+        domain, elements = construct_domain(roots + self._coefficients, extension = True)
+        if not domain.is_Field:
+            field = domain.get_field()
+            domain, elements = field, [field.convert_from(e, domain) for e in elements]
+
+        return domain, elements[:len(roots)], elements[len(roots):]
+
+    def _numerator(self, domain, denominator, values):
+        """
+        Get the numerator Q(x) of the generating function Q(x) / R(x) of the sequence,
+        where R(x) = 1 - c_1 * x - ... - c_k * x^k = prod_i (1 - r_i * x)^m_i
+
+        Returns:
+            list of domain elements: The coefficients of Q(x) from x^0 up
+        """
+        # Q(x) = R(x) * sum_t values[t] * x^t truncated to the degree of the recurrence
+        return [sum((denominator[a] * values[t - a] for a in range(0, t + 1)), domain.zero) for t in range(0, len(values))]
+
+    def _partialFractions(self, domain, denominator, numerator, r, m):
+        """
+        Get the coefficients A_l of A_l / (1 - r * x)^l in the partial fraction decomposition
+        of Q(x) / R(x) for a single root r. With z = 1 - r * x these are the first coefficients
+        of the power series of Q(x) / S(x) in z, where S(x) = R(x) / (1 - r * x)^m.
+
+        Returns:
+            list of domain elements: A_1 up to A_m where m is the multiplicity of the root
+        """
+        inverse = domain.one / r
+
+        # divide R(x) by (1 - r * x) m times
+        s = denominator
+        for _ in range(0, m):
+            quotient = [s[0]]
+            for c in s[1:-1]:
+                quotient.append(c + r * quotient[-1])
+            s = quotient
+
+        def substitute(poly):
+            # poly((1 - z) / r) up to z^(m-1) with horner's rule
+            series = [domain.zero] * m
+            for c in reversed(poly):
+                series = [(series[b] - (series[b - 1] if b else domain.zero)) * inverse for b in range(0, m)]
+                series[0] += c
+            return series
+
+        q = substitute(numerator)
+        s = substitute(s)
+
+        # power series division q / s
+        quotient = []
+        for b in range(0, m):
+            quotient.append((q[b] - sum((quotient[a] * s[b - a] for a in range(0, b)), domain.zero)) / s[0])
+
+        # Q / S = sum_l A_l * z^(m - l) + O(z^m)
+        return [quotient[m - l] for l in range(1, m + 1)]
+
+    def _rootCoefficients(self, domain, fractions, r, m):
+        """
+        Get the coefficients of n^j * r^n from the partial fractions of a root
+
+        Returns:
+            list of domain elements: The coefficients ordered per power of n
+        """
+        # The coefficient of x^t in 1 / (1 - r * x)^l is C(t + l - 1, l - 1) * r^t, with t = n - start
+        # this is a polynomial in n of degree l - 1 times r^n / r^start
+        binomial = [domain.one]
+        poly = [domain.zero] * m
+        for l, a in enumerate(fractions, 1):
+            if l > 1:
+                shift = domain.convert(l - 1 - self._start)
+                binomial = [(shift * c + (binomial[d - 1] if d else domain.zero)) / domain.convert(l - 1)
+                            for d, c in enumerate(binomial + [domain.zero])]
+            for d, c in enumerate(binomial):
+                poly[d] += a * c
+
+        scale = r**self._start if self._start >= 0 else (domain.one / r)**(-self._start)
+        return [c / scale for c in poly]
+
+    def _solveGroup(self, domain, roots, recurrence, group, values):
+        """
+        Solve the system of equations for the coefficients of a group of roots
+
+        Args:
+            domain (sympy domain): The field of the roots, the coefficients and the values
+            roots (list of domain elements): The roots of the group
+            recurrence (list of domain elements): The coefficients of the recurrence
+            group (list of int): The indices of the roots
+            values (list of domain elements): The values of the sequence at the consecutive indices
+
+        Returns:
+            list of domain elements: The coefficients ordered per root and then per power of n
+        """
+        denominator = [domain.one] + [-c for c in recurrence]
+        numerator = self._numerator(domain, denominator, values)
+
+        coefficients = []
+        for i, r in zip(group, roots):
+            m = self._roots[i][1]
+            fractions = self._partialFractions(domain, denominator, numerator, r, m)
+            coefficients.extend(self._rootCoefficients(domain, fractions, r, m))
+
+        return coefficients
+
+    def _getMaps(self):
+        """
+        Get per group of roots the linear map from the values to the coefficients
+
+        Returns:
+            list of tuple(list of int, sympy domain, list of list of domain elements, list of list of sympy expr):
+                The indices of the roots, their field and per coefficient its solution for every unit vector
+        """
+        if self._maps is None:
+            size = sum(m for _, m in self._roots)
+            self._maps = []
+            for group in self._groups:
+                domain, roots, recurrence = self._convert([self._roots[i][0] for i in group])
+                columns = [self._solveGroup(domain, roots, recurrence, group,
+                                            [domain.one if t == u else domain.zero for t in range(0, size)])
+                           for u in range(0, size)]
+                rows = [list(row) for row in zip(*columns)]
+                self._maps.append((group, domain, rows, [[domain.to_sympy(a) for a in row] for row in rows]))
+
+        return self._maps
+
+    def solve(self, values):
+        """
+        Solve the system of equations
+
+        Args:
+            values (list of sympy expr): The values of the sequence at the consecutive indices
+
+        Returns:
+            list of sympy expr: The coefficient of n^j * r_i^n, ordered per root and then per power of n
+        """
+        coefficients = [None] * len(self._roots)
+        for group, domain, rows, expressions in self._getMaps():
+            try:
+                converted = [domain.from_sympy(v) for v in values]
+                solved = [domain.to_sympy(sum((a * v for a, v in zip(row, converted)), domain.zero)) for row in rows]
+            except CoercionFailed:
+                # The values aren't in the field of the roots, they are combined symbolically
+                solved = [sympy.expand(sympy.Add(*(a * v for a, v in zip(row, values)))) for row in expressions]
+
+            for i in group:
+                m = self._roots[i][1]
+                coefficients[i], solved = solved[:m], solved[m:]
+
+        return [c for root in coefficients for c in root]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import re
+import sympy
+
+
+class RecurrenceParseError(Exception):
+    """
+    RecurrenceParseError will be thrown when an expression of a recurrence relation can't be parsed
+    """
+    def __init__(self, reason, line, column):
+        """
+        create RecurrenceParseError object
+        Args:
+            reason (string): Why the expression couldn't be parsed
+            line (int): The line of the error, starting at 1
+            column (int): The column of the error, starting at 1
+        """
+        super(RecurrenceParseError, self).__init__("%s at line %d, column %d" % (reason, line, column))
+        self.reason = reason
+        self.line = line
+        self.column = column
+
+
+class ExpressionParser(object):
+    """
+    ExpressionParser object that parses the expressions of recurrence relations, such as
+    2*s(n-1) + n^2 - 3/2, directly into sympy expressions with a recursive descent parser.
+    This avoids sympify which evaluates the expression as python code.
+
+    The grammar is:
+        expr    := term (("+" | "-") term)*
+        term    := unary (("*" | "/") unary)*
+        unary   := ("+" | "-") unary | power
+        power   := postfix (("^" | "**") unary)?
+        postfix := primary "!"*
+        primary := number | name | name "(" expr ("," expr)* ")" | "(" expr ")"
+    """
+
+    _tokenPattern = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_][A-Za-z_0-9]*)|(\*\*|[-+*/^()!,]))")
+
+    # Functions and constants that can be used in expressions besides those in the context
+    _functions = {
+        "sqrt": sympy.sqrt,
+        "factorial": sympy.factorial,
+        "exp": sympy.exp,
+        "log": sympy.log,
+        "sin": sympy.sin,
+        "cos": sympy.cos,
+        "Abs": sympy.Abs,
+    }
+    _constants = {
+        "pi": sympy.pi,
+        "E": sympy.E,
+        "I": sympy.I,
+    }
+
+    def __init__(self, context):
+        """
+        create ExpressionParser object
+
+        Args:
+            context (dict of string: sympy object): The functions and symbols of the recurrence, other
+                                                    names are parsed into new symbols
+        """
+        self._context = context
+
+    def _tokenize(self, text):
+        """
+        Split an expression into tokens
+
+        Args:
+            text (string): The expression
+
+        Returns:
+            list of tuple(string, string, int): The kind, the text and the offset of every token,
+                                                ending with an "end" token
+        """
+        tokens = []
+        position = 0
+        end = len(text.rstrip())
+        while position < end:
+            m = self._tokenPattern.match(text, position)
+            if not m:
+                offset = position + len(text[position:]) - len(text[position:].lstrip())
+                raise RecurrenceParseError("Unexpected character \"%s\"" % text[offset], 1, offset + 1)
+
+            if m.group(1):
+                tokens.append(("number", m.group(1), m.start(1)))
+            elif m.group(2):
+                tokens.append(("name", m.group(2), m.start(2)))
+            else:
+                tokens.append(("operator", m.group(3), m.start(3)))
+            position = m.end()
+
+        tokens.append(("end", "", end))
+        return tokens
+
+    def parse(self, text):
+        """
+        Parse an expression
+
+        Args:
+            text (string): The expression
+
+        Returns:
+            sympy expression: The parsed expression
+        """
+        self._tokens = self._tokenize(text)
+        self._index = 0
+
+        expr = self._parseExpr()
+        self._expect("end")
+        return expr
+
+    def _peek(self):
+        return self._tokens[self._index]
+
+    def _accept(self, *values):
+        """
+        Consume the next token when it is one of the given operators
+
+        Returns:
+            string: The operator, None if the next token isn't one of them
+        """
+        kind, value, _ = self._tokens[self._index]
+        if kind == "operator" and value in values:
+            self._index += 1
+            return value
+
+        return None
+
+    def _error(self, expected):
+        kind, value, offset = self._peek()
+        found = "end of expression" if kind == "end" else "\"%s\"" % value
+        return RecurrenceParseError("Expected %s but found %s" % (expected, found), 1, offset + 1)
+
+    def _expect(self, value):
+        if value == "end":
+            if self._peek()[0] != "end":
+                raise self._error("end of expression")
+        elif self._accept(value) is None:
+            raise self._error("\"%s\"" % value)
+
+    def _parseExpr(self):
+        expr = self._parseTerm()
+        while True:
+            operator = self._accept("+", "-")
+            if operator is None:
+                return expr
+            right = self._parseTerm()
+            expr = expr + right if operator == "+" else expr - right
+
+    def _parseTerm(self):
+        expr = self._parseUnary()
+        while True:
+            operator = self._accept("*", "/")
+            if operator is None:
+                return expr
+            right = self._parseUnary()
+            expr = expr * right if operator == "*" else expr / right
+
+    def _parseUnary(self):
+        operator = self._accept("+", "-")
+        if operator is None:
+            return self._parsePower()
+
+        expr = self._parseUnary()
+        return -expr if operator == "-" else expr
+
+    def _parsePower(self):
+        expr = self._parsePostfix()
+        if self._accept("^", "**") is not None:
+            expr = expr**self._parseUnary()
+
+        return expr
+
+    def _parsePostfix(self):
+        expr = self._parsePrimary()
+        while self._accept("!") is not None:
+            expr = sympy.factorial(expr)
+
+        return expr
+
+    def _parsePrimary(self):
+        kind, value, offset = self._peek()
+
+        if kind == "number":
+            self._index += 1
+            return sympy.Integer(value) if value.isdigit() else sympy.Float(value)
+
+        if kind == "name":
+            self._index += 1
+            if self._accept("(") is None:
+                if value in self._context:
+                    return self._context[value]
+                if value in self._constants:
+                    return self._constants[value]
+                return sympy.Symbol(value)
+
+            function = self._context.get(value, self._functions.get(value))
+            if function is None:
+                raise RecurrenceParseError("Unknown function \"%s\"" % value, 1, offset + 1)
+
+            args = [self._parseExpr()]
+            while self._accept(",") is not None:
+                args.append(self._parseExpr())
+            self._expect(")")
+
+            return function(*args)
+
+        if self._accept("(") is not None:
+            expr = self._parseExpr()
+            self._expect(")")
+            return expr
+
+        raise self._error("a number, name or \"(\"")
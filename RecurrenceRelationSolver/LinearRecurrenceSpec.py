@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+
+from .TermSplitter import TermSplitter
+
+
+class LinearRecurrenceSpec(object):
+    """
+    LinearRecurrenceSpec object that describes a linear recurrence relation with constant
+    coefficients: s(n) = c_1 * s(n-1) + ... + c_k * s(n-k) + F(n). It is determined once
+    from the recurrence so solvers, evaluators and caches don't have to walk the expression
+    again. Specs are immutable and hashable.
+    """
+
+    __slots__ = ("order", "coefficients", "nonHomogeneous", "terms", "_hash")
+
+    def __init__(self, coefficients, nonHomogeneous, terms):
+        """
+        create LinearRecurrenceSpec object
+
+        Args:
+            coefficients (tuple of sympy expr): The coefficient of s(n-i) at position i - 1
+            nonHomogeneous (sympy expr): The part of the recurrence that doesn't refer to earlier values
+            terms (tuple of tuple(sympy expr, int, sympy expr)): The non homogeneous part as terms
+                                                                 (base, degree, constant) meaning
+                                                                 constant * n^degree * base^n, None
+                                                                 if it is not of that form
+        """
+        self.order = len(coefficients)
+        self.coefficients = coefficients
+        self.nonHomogeneous = nonHomogeneous
+        self.terms = terms
+        self._hash = hash((self.coefficients, self.nonHomogeneous))
+
+    @classmethod
+    def fromExpression(cls, expr, s, n):
+        """
+        Determine the spec of a recurrence
+
+        Args:
+            expr (sympy expression): The expanded right hand side of s(n) = ...
+            s (sympy function): The function of the recurrence
+            n (sympy symbol): The variable of the recurrence
+
+        Returns:
+            LinearRecurrenceSpec: The spec, None if the recurrence is not linear with constant coefficients
+        """
+        splitter = TermSplitter(n)
+        coefficients = {}
+        nonHomogeneous = sympy.Integer(0)
+        terms = {}
+        for term in sympy.Add.make_args(expr):
+            if term == 0:
+                continue
+
+            if not term.has(s):
+                nonHomogeneous += term
+                classified = splitter.split(term) if terms is not None else None
+                if classified is None:
+                    terms = None
+                else:
+                    base, degree, constant = classified
+                    terms[(base, degree)] = terms.get((base, degree), 0) + constant
+                continue
+
+            # the term has to be a constant times a single s(n-i)
+            calls = [a for a in sympy.Mul.make_args(term) if a.func == s]
+            if len(calls) != 1:
+                return None
+
+            coefficient = term / calls[0]
+            shift = n - calls[0].args[0]
+            if coefficient.has(s) or coefficient.has(n) or not shift.is_Integer or shift <= 0:
+                return None
+
+            coefficients[int(shift)] = coefficients.get(int(shift), 0) + coefficient
+
+        order = max([k for k, c in coefficients.items() if c != 0], default = 0)
+        if order == 0:
+            return None
+
+        if terms is not None:
+            terms = tuple(sorted(((b, d, c) for (b, d), c in terms.items() if c != 0), key = sympy.default_sort_key))
+
+        return cls(tuple(sympy.sympify(coefficients.get(i, 0)) for i in range(1, order + 1)), nonHomogeneous, terms)
+
+    def __eq__(self, other):
+        return isinstance(other, LinearRecurrenceSpec) and \
+            self.coefficients == other.coefficients and self.nonHomogeneous == other.nonHomogeneous
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return "LinearRecurrenceSpec(%s, %s)" % (str(self.coefficients), str(self.nonHomogeneous))
+
+    def key(self):
+        """
+        Get a stable string that identifies the spec, also between processes
+
+        Returns:
+            string: The key
+        """
+        return "%s|%s" % (",".join(sympy.srepr(c) for c in self.coefficients), sympy.srepr(self.nonHomogeneous))
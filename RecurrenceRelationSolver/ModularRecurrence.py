@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+
+class ModularRecurrence(object):
+    """
+    ModularRecurrence object that evaluates a homogeneous linear recurrence relation with
+    integer coefficients modulo m at huge indices with Kitamasa's method. The value at
+    index N is a linear combination of the first k values, its weights are the coefficients
+    of x^N modulo the characteristic polynomial, which is found by binary exponentiation
+    in O(k^2 log N) multiplications of integers modulo m.
+    """
+
+    def __init__(self, coefficients, modulus):
+        """
+        create ModularRecurrence object
+
+        Args:
+            coefficients (list of int): The coefficient of s(n-i) at position i - 1, reduced modulo m
+            modulus (int): The modulus m
+        """
+        self._coefficients = coefficients
+        self._modulus = modulus
+        self._degree = len(coefficients)
+
+    def _multiply(self, a, b):
+        """
+        Multiply two polynomials modulo the characteristic polynomial
+        x^k - c_1 * x^(k-1) - ... - c_k and modulo m
+
+        Args:
+            a (list of int): The coefficients of the left hand side from x^0 up to x^(k-1)
+            b (list of int): The coefficients of the right hand side from x^0 up to x^(k-1)
+
+        Returns:
+            list of int: The coefficients of the product from x^0 up to x^(k-1)
+        """
+        k = self._degree
+        m = self._modulus
+
+        product = [0] * (2 * k - 1)
+        for i, x in enumerate(a):
+            if x:
+                for j, y in enumerate(b):
+                    product[i + j] += x * y
+
+        # x^d = c_1 * x^(d-1) + ... + c_k * x^(d-k) for every d >= k
+        for d in range(2 * k - 2, k - 1, -1):
+            t = product[d] % m
+            if t:
+                for i, c in enumerate(self._coefficients, 1):
+                    product[d - i] += t * c
+
+        return [x % m for x in product[:k]]
+
+    def valueAt(self, index, values):
+        """
+        Get the value at an index
+
+        Args:
+            index (int): The index relative to the first value
+            values (list of int): The first k values modulo m
+
+        Returns:
+            int: The value at the index modulo m
+        """
+        k = self._degree
+        m = self._modulus
+        if index < k:
+            return values[index] % m
+
+        # x^index modulo the characteristic polynomial
+        result = [1 % m] + [0] * (k - 1)
+        power = [0, 1] + [0] * (k - 2) if k > 1 else [self._coefficients[0] % m]
+        while index > 0:
+            if index & 1:
+                result = self._multiply(result, power)
+            index >>= 1
+            if index > 0:
+                power = self._multiply(power, power)
+
+        return sum(w * v for w, v in zip(result, values)) % m
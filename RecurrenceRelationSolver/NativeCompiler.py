@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import ctypes
+import hashlib
+import logging
+import math
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+import numpy
+import sympy
+from sympy.printing.c import C99CodePrinter
+from sympy.printing.pycode import PythonCodePrinter
+
+
+class NativeCompiler(object):
+    """
+    NativeCompiler object that turns closed forms into straight-line source code with the common
+    subexpressions hoisted into temporaries. The C source is built with the local C compiler into
+    a shared object that is cached on disk by the hash of its source and loaded through ctypes,
+    which evaluates a whole float64 array in a single call. Hosts without a working compiler
+    evaluate the generated python source instead. Shared objects are only loaded from a cache
+    directory that is owned by the current user and can't be written by anyone else.
+    """
+
+    def __init__(self, directory = None, compiler = None):
+        """
+        create NativeCompiler object
+
+        Args:
+            directory (string): The directory the shared objects are cached in, defaults to
+                                RecurrenceRelationSolver in $XDG_CACHE_HOME or ~/.cache
+            compiler (string): The C compiler, defaults to $CC or cc
+        """
+        cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        self._directory = directory or os.path.join(cache, "RecurrenceRelationSolver")
+        self._compiler = compiler or os.environ.get("CC", "cc")
+        self._libraries = {}
+        self._lock = threading.Lock()
+
+    def _straightLine(self, expr, printer):
+        """
+        Print an expression as a list of assignments to temporaries and a final expression
+
+        Args:
+            expr (sympy expression): The expression
+            printer (sympy CodePrinter): The printer of the language
+
+        Returns:
+            tuple(list of tuple(string, string), string): The temporaries with their values and the result
+        """
+        replacements, (result,) = sympy.cse(expr, symbols = sympy.numbered_symbols("t"))
+        return [(str(t), printer.doprint(e)) for t, e in replacements], printer.doprint(result)
+
+    def getCSource(self, expr, n, name = "closed_form"):
+        """
+        Get the closed form as C source. The function evaluates count values of n at once,
+        void name(const double *n, double *out, long count)
+
+        Args:
+            expr (sympy expression): The closed form
+            n (sympy Symbol): The variable of the closed form
+            name (string): The name of the function
+
+        Returns:
+            string: The C source
+        """
+        x = sympy.Symbol("x")
+        temporaries, result = self._straightLine(expr.xreplace({ n: x }), C99CodePrinter())
+
+        lines = ["#include <math.h>", "",
+                 "static double %s_value(double x)" % name, "{"]
+        lines += ["    const double %s = %s;" % t for t in temporaries]
+        lines += ["    return %s;" % result, "}", "",
+                  "void %s(const double *n, double *out, long count)" % name, "{",
+                  "    for (long i = 0; i < count; i++)",
+                  "        out[i] = %s_value(n[i]);" % name, "}", ""]
+        return "\n".join(lines)
+
+    def getPythonSource(self, expr, n, name = "closed_form"):
+        """
+        Get the closed form as python source of a function of a single n using the math module
+
+        Args:
+            expr (sympy expression): The closed form
+            n (sympy Symbol): The variable of the closed form
+            name (string): The name of the function
+
+        Returns:
+            string: The python source
+        """
+        x = sympy.Symbol("x")
+        temporaries, result = self._straightLine(expr.xreplace({ n: x }), PythonCodePrinter())
+
+        lines = ["import math", "", "", "def %s(x):" % name]
+        lines += ["    %s = %s" % t for t in temporaries]
+        lines += ["    return %s" % result, ""]
+        return "\n".join(lines)
+
+    def _checkPrivate(self, path, kind):
+        """
+        Check that a path is owned by the current user and can't be written by anyone else
+
+        Args:
+            path (string): The path to check, symbolic links are not followed
+            kind (function(int): bool): Checks the type of the file, stat.S_ISDIR or stat.S_ISREG
+
+        Raises:
+            OSError: When the path is of another type, owned by another user or writable by others
+        """
+        info = os.lstat(path)
+        if not kind(info.st_mode):
+            raise OSError("%s has an unexpected file type" % path)
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            raise OSError("%s is not owned by the current user" % path)
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise OSError("%s is writable by other users" % path)
+
+    def _build(self, source, name):
+        """
+        Build C source into a shared object unless it has been built before
+
+        Args:
+            source (string): The C source
+            name (string): The name of the function
+
+        Returns:
+            ctypes function: The loaded function
+        """
+        digest = hashlib.sha256((self._compiler + "\0" + source).encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            if digest in self._libraries:
+                return getattr(self._libraries[digest], name)
+
+            os.makedirs(self._directory, mode = 0o700, exist_ok = True)
+            self._checkPrivate(self._directory, stat.S_ISDIR)
+
+            path = os.path.join(self._directory, "%s_%s.so" % (name, digest))
+            if not os.path.lexists(path):
+                # Build under a unique name and move it into place, other processes can be building it too
+                handle, temporary = tempfile.mkstemp(suffix = ".so", dir = self._directory)
+                os.close(handle)
+                try:
+                    subprocess.run([self._compiler, "-O2", "-shared", "-fPIC", "-x", "c", "-", "-o", temporary, "-lm"],
+                                   input = source.encode("utf-8"), check = True, capture_output = True)
+                    # The linker creates the file with the permissions of the umask
+                    os.chmod(temporary, 0o700)
+                    os.replace(temporary, path)
+                finally:
+                    if os.path.exists(temporary):
+                        os.remove(temporary)
+
+            self._checkPrivate(path, stat.S_ISREG)
+            library = ctypes.CDLL(path)
+            function = getattr(library, name)
+            function.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_long]
+            function.restype = None
+            self._libraries[digest] = library
+            return function
+
+    def _compileC(self, expr, n, name):
+        """
+        Compile the closed form into a batch evaluator of native code
+
+        Returns:
+            function(numpy array): The evaluator, None if the closed form can't be compiled
+        """
+        if shutil.which(self._compiler) is None:
+            return None
+
+        try:
+            function = self._build(self.getCSource(expr, n, name), name)
+        except (sympy.printing.codeprinter.PrintMethodNotImplementedError, subprocess.CalledProcessError, OSError) as e:
+            logging.info("Compiling the closed form to C failed: %s" % str(e))
+            return None
+
+        def evaluate(values):
+            values = numpy.ascontiguousarray(values, dtype = numpy.float64)
+            out = numpy.empty_like(values)
+            function(values.ctypes.data, out.ctypes.data, values.size)
+            return out
+
+        return evaluate
+
+    def _compilePython(self, expr, n, name):
+        """
+        Compile the closed form into a batch evaluator of python source
+
+        Returns:
+            function(numpy array): The evaluator
+        """
+        namespace = {}
+        exec(compile(self.getPythonSource(expr, n, name), "<%s>" % name, "exec"), namespace)
+        function = namespace[name]
+
+        def value(x):
+            # Integral n keeps functions such as math.factorial working
+            try:
+                return float(function(int(x) if float(x).is_integer() else x))
+            except OverflowError:
+                return math.inf
+
+        def evaluate(values):
+            values = numpy.asarray(values, dtype = numpy.float64)
+            return numpy.fromiter((value(x) for x in values.flat), numpy.float64, values.size).reshape(values.shape)
+
+        return evaluate
+
+    def compile(self, expr, n, name = "closed_form"):
+        """
+        Compile the closed form into a float64 batch evaluator, native when a C compiler is available
+
+        Args:
+            expr (sympy expression): The closed form, it must not contain CRootOf
+            n (sympy Symbol): The variable of the closed form
+            name (string): The name of the function
+
+        Returns:
+            function(numpy array): Evaluates the closed form at every n of the array
+        """
+        return self._compileC(expr, n, name) or self._compilePython(expr, n, name)
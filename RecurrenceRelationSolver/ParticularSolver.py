@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+from sympy.polys.constructor import construct_domain
+
+
+class ParticularSolver(object):
+    """
+    ParticularSolver object that finds a particular solution of a linear recurrence with
+    constant coefficients s(n) = c_1 * s(n-1) + ... + c_k * s(n-k) + F(n) where F(n) is a
+    sum of terms constant * n^d * b^n.
+
+    For every base b the recurrence operator L = 1 - sum_i c_i * E^-i, with E the shift
+    operator, acts on g(n) * b^n as b^n * sum_j w_j * g^(j)(n) / j! where
+    w_j = [j = 0] - sum_i c_i * b^-i * (-i)^j. The first m weights vanish when b is a root
+    of multiplicity m of the characteristic equation. The particular solution is then
+    n^m * q(n) * b^n and the coefficients of q follow from a triangular system, so no
+    pattern matching, generic solving or verification is needed.
+    """
+
+    def __init__(self, coefficients):
+        """
+        create ParticularSolver object
+
+        Args:
+            coefficients (tuple of sympy expr): The coefficient of s(n-i) at position i - 1
+        """
+        self._coefficients = list(coefficients)
+
+    def _weights(self, domain, coefficients, base, count):
+        """
+        Get the weights w_j of the operator for a base
+
+        Args:
+            domain (sympy domain): The field of the coefficients and the base
+            coefficients (list of domain elements): The coefficients of the recurrence
+            base (domain element): The base
+            count (int): The amount of weights
+
+        Returns:
+            list of domain elements: w_0 up to w_(count-1)
+        """
+        inverse = domain.one / base
+
+        # c_i * b^-i for every shift i
+        scaled = []
+        power = domain.one
+        for c in coefficients:
+            power *= inverse
+            scaled.append(c * power)
+
+        weights = []
+        for j in range(0, count):
+            w = domain.one if j == 0 else domain.zero
+            for i, c in enumerate(scaled, 1):
+                w -= c * domain.convert((-i)**j)
+            weights.append(w)
+
+        return weights
+
+    def solve(self, terms, n):
+        """
+        Get the particular solution
+
+        Args:
+            terms (tuple of tuple(sympy expr, int, sympy expr)): The non homogeneous part as terms
+                                                                 (base, degree, constant) meaning
+                                                                 constant * n^degree * base^n
+            n (sympy symbol): The variable of the recurrence
+
+        Returns:
+            sympy expression: The particular solution
+        """
+        polys = {}
+        for base, degree, constant in terms:
+            polys.setdefault(base, {})[degree] = constant
+
+        # bring the coefficients, the bases and the constants into a single field
+        bases = list(polys)
+        constants = [c for base in bases for c in polys[base].values()]
+        domain, elements = construct_domain(self._coefficients + bases + constants, extension = True)
+        if not domain.is_Field:
+            field = domain.get_field()
+            domain, elements = field, [field.convert_from(e, domain) for e in elements]
+
+        elements = iter(elements)
+        coefficients = [next(elements) for _ in self._coefficients]
+        converted = [next(elements) for _ in bases]
+
+        solution = []
+        for base, b in zip(bases, converted):
+            poly = { d: next(elements) for d in polys[base] }
+            highest = max(poly)
+
+            weights = self._weights(domain, coefficients, b, len(coefficients) + highest + 1)
+            multiplicity = next(j for j, w in enumerate(weights) if w)
+
+            # L[n^(m+j) * b^n] = b^n * sum_l w_l * C(m+j, l) * n^(m+j-l), so the coefficient of n^d
+            # only depends on q_j with j >= d. Solve from the highest power down.
+            q = {}
+            for d in range(highest, -1, -1):
+                rest = poly.get(d, domain.zero)
+                for j in range(d + 1, highest + 1):
+                    rest -= q[j] * weights[multiplicity + j - d] * domain.convert(sympy.binomial(multiplicity + j, d))
+                q[d] = rest / (weights[multiplicity] * domain.convert(sympy.binomial(multiplicity + d, d)))
+
+            polynomial = sympy.Add(*[domain.to_sympy(c) * n**(multiplicity + d) for d, c in q.items()])
+            solution.append(polynomial * base**n)
+
+        return sympy.Add(*solution)
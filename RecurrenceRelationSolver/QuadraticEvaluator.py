@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+from fractions import Fraction
+
+from .TermSplitter import TermSplitter
+
+
+class QuadraticEvaluator(object):
+    """
+    QuadraticEvaluator object that evaluates closed forms sum_i c_i * n^d_i * b_i^n exactly when
+    the constants and bases all lie in a single quadratic field Q(sqrt(d)). Numbers are pairs
+    (a, b) of Fractions meaning a + b * sqrt(d) and the powers are found by binary exponentiation,
+    so the values are exact at any n without tuning a precision.
+    """
+
+    def __init__(self, closedForm, n):
+        """
+        create QuadraticEvaluator object
+
+        Args:
+            closedForm (sympy expression): The closed form
+            n (sympy Symbol): The variable of the closed form
+
+        Raises:
+            ValueError: If the closed form is not of the supported form
+        """
+        splitter = TermSplitter(n)
+        terms = []
+        expanded = sympy.expand(closedForm, power_base = False, power_exp = True, mul = True, multinomial = True)
+        for term in sympy.Add.make_args(expanded):
+            split = splitter.split(term)
+            if split is None:
+                raise ValueError("The term \"%s\" is not of the form c * n^d * b^n" % str(term))
+            base, degree, constant = split
+            terms.append((constant, degree, base))
+
+        radicals = set()
+        for constant, _, base in terms:
+            for power in (constant.atoms(sympy.Pow) | base.atoms(sympy.Pow)):
+                if power.exp == sympy.Rational(1, 2) and power.base.is_Integer:
+                    radicals.add(power)
+        if len(radicals) > 1:
+            raise ValueError("The closed form contains more than one square root: %s" % str(radicals))
+
+        self._radical = radicals.pop() if radicals else None
+        self._d = int(self._radical.base) if self._radical is not None else 0
+
+        # Terms with the same power of n and the same base are combined
+        self._terms = {}
+        for constant, degree, base in terms:
+            key = (degree, self._split(base))
+            self._terms[key] = self._add(self._terms.get(key, (Fraction(0), Fraction(0))), self._split(constant))
+
+    def _split(self, value):
+        """
+        Write a constant as a + b * sqrt(d)
+
+        Args:
+            value (sympy expression): The constant
+
+        Returns:
+            tuple(Fraction, Fraction): a and b
+        """
+        t = sympy.Dummy("t")
+        value = sympy.expand(value)
+        if self._radical is not None:
+            value = value.xreplace({ self._radical: t })
+
+        try:
+            poly = sympy.Poly(value, t)
+        except sympy.PolynomialError:
+            poly = None
+        if poly is None or not (poly.domain.is_QQ or poly.domain.is_ZZ):
+            raise ValueError("The constant \"%s\" is not in a quadratic field" % str(value))
+
+        # t^2 = d
+        parts = [Fraction(0), Fraction(0)]
+        for (power,), c in poly.terms():
+            parts[power % 2] += Fraction(int(c.p), int(c.q)) * Fraction(self._d)**(power // 2)
+        return tuple(parts)
+
+    def _add(self, x, y):
+        """
+        Add two numbers of the field
+
+        Returns:
+            tuple(Fraction, Fraction): The sum
+        """
+        return (x[0] + y[0], x[1] + y[1])
+
+    def _multiply(self, x, y):
+        """
+        Multiply two numbers of the field
+
+        Returns:
+            tuple(Fraction, Fraction): The product
+        """
+        return (x[0] * y[0] + self._d * x[1] * y[1], x[0] * y[1] + x[1] * y[0])
+
+    def _power(self, x, exponent):
+        """
+        Raise a number to an integer power with binary exponentiation
+
+        Args:
+            x (tuple(Fraction, Fraction)): The number
+            exponent (int): The exponent
+
+        Returns:
+            tuple(Fraction, Fraction): The power
+        """
+        if exponent < 0:
+            # (a + b * sqrt(d))^-1 = (a - b * sqrt(d)) / (a^2 - d * b^2)
+            norm = x[0]**2 - self._d * x[1]**2
+            x, exponent = (x[0] / norm, -x[1] / norm), -exponent
+
+        result = (Fraction(1), Fraction(0))
+        while exponent > 0:
+            if exponent & 1:
+                result = self._multiply(result, x)
+            exponent >>= 1
+            if exponent > 0:
+                x = self._multiply(x, x)
+        return result
+
+    def evaluate(self, n):
+        """
+        Get the exact value of the closed form
+
+        Args:
+            n (int): The value of n
+
+        Returns:
+            int/Fraction/sympy expr: The value, rational values are native python numbers
+        """
+        n = int(n)
+        powers = {}
+        total = (Fraction(0), Fraction(0))
+        for (degree, base), constant in self._terms.items():
+            if base not in powers:
+                powers[base] = self._power(base, n)
+            term = self._multiply(constant, powers[base])
+            total = self._add(total, (term[0] * n**degree, term[1] * n**degree))
+
+        a, b = total
+        if b != 0:
+            return sympy.Rational(a.numerator, a.denominator) + sympy.Rational(b.numerator, b.denominator) * self._radical
+        return a.numerator if a.denominator == 1 else a
@@ -1,10 +1,34 @@
 #!/usr/bin/env python3
 # coding=utf-8
+import collections
+import contextlib
+import copy
+import hashlib
 import logging
+import multiprocessing
+import multiprocessing.connection
 import re
+import threading
+import time
+import mpmath
+import numpy
 import sympy
+from fractions import Fraction
 from sympy.solvers.solveset import linsolve
 
+from .ClosedFormNormalizer import ClosedFormNormalizer
+from .ClosedFormProver import ClosedFormProver
+from .CompanionMatrix import CompanionMatrix
+from .ConfluentVandermonde import ConfluentVandermonde
+from .ExpressionParser import ExpressionParser
+from .LinearRecurrenceSpec import LinearRecurrenceSpec
+from .ModularRecurrence import ModularRecurrence
+from .NativeCompiler import NativeCompiler
+from .ParticularSolver import ParticularSolver
+from .QuadraticEvaluator import QuadraticEvaluator
+from .RootFinder import RootFinder
+from .StepCompiler import StepCompiler
+
 class RecurrenceSolveFailed(Exception):
     """
     RecurrenceSolveFailed will be thrown when recurrence relation couldn't be solved fails
@@ -17,19 +41,75 @@ class RecurrenceSolveFailed(Exception):
         """
         self.reason = reason
 
+def _simplifyWorker(connection, normalizer, expr, pretty):
+    """
+    Entry point of a worker process, simplifies an expression and sends back the result
+
+    Args:
+        connection (multiprocessing.Connection): Where to send the simplified expression
+        normalizer (ClosedFormNormalizer): The normalizer to simplify with
+        expr (sympy expression): The expression to simplify
+        pretty (bool): Also run sympy's generic simplify()
+    """
+    connection.send(normalizer.simplify(expr, pretty))
+    connection.close()
+
+def _engineWorker(connection, relation, engine):
+    """
+    Entry point of a worker process, solves a relation with a single engine and sends back
+    the unsimplified closed form, or None when the engine couldn't solve the relation
+
+    Args:
+        connection (multiprocessing.Connection): Where to send the closed form
+        relation (RecurrenceRelation): The relation to solve
+        engine (string): The name of the engine
+    """
+    try:
+        solved = relation._solveWith(engine)
+    except Exception as e:
+        logging.info("The %s engine failed: %s" % (engine, str(e)))
+        solved = None
+
+    connection.send(solved)
+    connection.close()
+
 class RecurrenceRelation(object):
     """
     RecurrenceRelation object that contains a recurrence relations
     and initial conitions. Allows for solving and verifications
     """
 
-    def __init__(self, recurrence, initialConditions):
+    # Values further away than this from the last calculated value are
+    # calculated with the companion matrix instead of step by step
+    _maxIterativeSteps = 256
+
+    # Roots of characteristic equations shared between all relations
+    _rootFinder = RootFinder()
+
+    # Builds closed forms into native code, the shared objects are cached on disk
+    _nativeCompiler = NativeCompiler()
+
+    # The methods that solve a relation into an unsimplified closed form, by name
+    _engines = collections.OrderedDict([
+        ("characteristic", "_solveCharacteristic"),
+        ("generatingFunction", "_solveGeneratingFunction"),
+    ])
+
+    # Per shape of relation how often every engine won a race, shared between all relations
+    _engineWins = {}
+
+    def __init__(self, recurrence, initialConditions, memoize = False, checkpointInterval = None):
         """
         create RecurrenceRelation object
 
         Args:
-            recurrence (string): The recurrence as a string
-            initialConditions (dict of string: string): The initial conditions
+            recurrence (string/sympy expression): The recurrence as a string or parsed expression
+            initialConditions (dict of int: string/sympy expression): The initial conditions
+            memoize (bool): Keep every value calculated from the recurrence in memory
+            checkpointInterval (int): Keep the values needed to continue the recurrence at
+                                      every multiple of this index, None to disable. Checkpoints
+                                      are never evicted so they speed up random access at the cost
+                                      of memory that grows with the highest index calculated
         """
 
         # contains the context for running sympy functions
@@ -40,29 +120,193 @@ class RecurrenceRelation(object):
         }
 
         # Translate input string expression to sympy expression
+        self._parser = ExpressionParser(self._sympy_context)
         self._recurrence = self._to_sympy(recurrence)
+
+        # The structure of a linear recurrence with constant coefficients, None if the
+        # recurrence isn't of that form
+        self._spec = LinearRecurrenceSpec.fromExpression(self._recurrence, self._sympy_context["s"], self._sympy_context["n"])
+
+        self._memoize = memoize
+        self._checkpointInterval = checkpointInterval
+
+        # The degree of the recurrence, determined when first needed
+        self._degree = None
+
+        # Contains everything of the solve that doesn't depend on the initial conditions.
+        # It is shared with the relations created by withInitialConditions
+        self._general = {}
+
+        self._setInitialConditions(initialConditions)
+
+        # Contains the coefficients of a linear recurrence with constant rational coefficients,
+        # False if the recurrence isn't of that form
+        self._linearCoefficients = None
+
+        # Contains the companion matrix engine for evaluating the recurrence, False if
+        # the recurrence can't be evaluated with it
+        self._companionMatrix = None
+
+        # Contains the native step function for evaluating the recurrence, False if
+        # the recurrence can't be evaluated with it
+        self._stepFunction = None
+
+        # Compiles the right hand side of the recurrence into python callables, False if
+        # the recurrence can't be compiled
+        self._stepCompiler = None
+
+        # Records the time and memory spent in every stage of solving, None when not profiling
+        self._stats = None
+
+        # The time.monotonic() after which solving skips simplification, None for no limit
+        self._deadline = None
+
+        # Brings solutions into a canonical form, sympy's simplify() is only used when pretty is set
+        self._normalizer = ClosedFormNormalizer(self._sympy_context["n"])
+        self._pretty = False
+
+        # The collected basis terms of the general solution and their coefficients in the closed
+        # form while solving, None when the closed form has to be normalized from scratch
+        self._combination = None
+
+        # The engine to solve with and the cache with the race record while solving
+        self._engine = None
+        self._cache = None
+
+    def _setInitialConditions(self, initialConditions):
+        """
+        Set the initial conditions and reset everything that depends on them
+
+        Args:
+            initialConditions (dict of int: string): The initial conditions
+        """
         self._initialConditions = { k: self._to_sympy(v) for (k,v) in initialConditions.items() }
-        
-        # Solved values will be stored here in a bottom up dynamic programming manner
-        self._solvedValues = dict(self._initialConditions)
+
+        # Solved values will be stored here in a bottom up dynamic programming manner when
+        # memoization is enabled, rational values are stored as native python numbers
+        self._solvedValues = { k: self._toRational(v) if v.is_Rational else v for (k,v) in self._initialConditions.items() }
+
+        # Sparse checkpoints containing the window of values s(i), ..., s(i-k+1) needed
+        # to continue the recurrence from index i
+        self._checkpoints = {}
+
+        # The index and the window s(i), ..., s(i-k+1) of the newest value calculated, so calculating the
+        # values one after another continues from there instead of from the last checkpoint
+        self._cursor = None
 
         # Contains the closed from as calculated by our own algorithm
         self._closedForm = None
 
+        # Whether the closed form has been simplified, it isn't when the time budget ran out
+        self._simplified = True
+
+        # Simplifies the closed form after solving ran out of time, None if it isn't running
+        self._simplifyThread = None
+
+        # Contains the closed form compiled into a callable per backend, with the precision of its roots
+        self._closedFormFunctions = {}
+
+        # The engine that solved the closed form, None if it was found in the cache
+        self._solvedBy = None
+
+        # Evaluates the closed form exactly in a quadratic field, False if it isn't in one
+        self._quadraticEvaluator = None
+
+        # The coefficients of the annihilated recurrence with the index and the values it starts
+        # from, used for evaluating modulo m
+        self._annihilated = None
+
+    def withInitialConditions(self, initialConditions):
+        """
+        Create a relation with the same recurrence but different initial conditions. The
+        general and particular solution and the inverted system of equations for the initial
+        conditions are shared, so solving the new relation only needs a matrix product.
+
+        Args:
+            initialConditions (dict of int: string): The initial conditions
+
+        Returns:
+            RecurrenceRelation: The relation with the new initial conditions
+        """
+        relation = copy.copy(self)
+        relation._setInitialConditions(initialConditions)
+        return relation
+
+    def _stage(self, name):
+        """
+        Get a context manager that records a stage of solving when profiling
+
+        Args:
+            name (string): The name of the stage
+
+        Returns:
+            context manager: The stage
+        """
+        if self._stats is None:
+            return contextlib.nullcontext()
+
+        return self._stats.stage(name)
+
+    def _simplify(self, expr):
+        """
+        Simplify an expression within the time left of the solve budget. When there is a budget
+        the simplification runs in a separate process so it can be stopped when it takes too long.
+
+        Args:
+            expr (sympy expression): The expression to simplify
+
+        Returns:
+            sympy expression: The simplified expression, None if there was no time left
+        """
+        if self._deadline is not None and self._deadline <= time.monotonic():
+            logging.info("Out of time, skipped simplifying")
+            return None
+
+        # Combining the shared collected basis terms only normalizes a constant per term
+        if self._combination is not None and not self._pretty:
+            return self._normalizer.combine(*self._combination)
+
+        if self._deadline is None:
+            return self._normalizer.simplify(expr, self._pretty)
+
+        remaining = self._deadline - time.monotonic()
+
+        receiver, sender = multiprocessing.Pipe(duplex = False)
+        process = multiprocessing.Process(target = _simplifyWorker, args = (sender, self._normalizer, expr, self._pretty), daemon = True)
+        process.start()
+        sender.close()
+
+        simplified = None
+        try:
+            if receiver.poll(remaining):
+                simplified = receiver.recv()
+        except EOFError:
+            pass
+
+        if simplified is None:
+            logging.info("Out of time, stopped simplifying")
+            process.terminate()
+
+        receiver.close()
+        process.join()
+        return simplified
+
     def _to_sympy(self, expr):
         """
-        sympy represents powers not with ^ but with **.
-        Translate from normal representation to sympy representation here
+        Parse an expression in normal format, where powers are written with ^,
+        into an expanded sympy expression
         
         Args:
-            expr (string): string of an expression in normal format
+            expr (string/sympy expression): string of an expression in normal format, or an
+                                            expression that has been parsed already
 
         Returns:
             sympy expression: The  string parsed into a sympy expression
         """
-        raw = re.sub(r"\^", "**", expr)
+        if isinstance(expr, sympy.Basic):
+            return expr.expand()
 
-        return sympy.sympify(raw, self._sympy_context).expand()
+        return self._parser.parse(str(expr)).expand()
 
     def _from_sympy(self, expr):
         """
@@ -117,6 +361,15 @@ class RecurrenceRelation(object):
         """
         return min([int(k) for k,v in self._initialConditions.items()])
 
+    def getSolvingEngine(self):
+        """
+        get the engine that solved the recurrence
+
+        Returns:
+            string: The name of the engine, None if it hasn't been solved or the closed form came from the cache
+        """
+        return self._solvedBy
+
     def _set_free_variables_to_zero(self, solution):
         """
         Given a sympy solution with multiple solution fill out any free variables as 0.
@@ -152,19 +405,19 @@ class RecurrenceRelation(object):
             "n": self._sympy_context["n"]
         }
 
-        # Generate general solution
+        # Generate general solution, the roots are used as they are because
+        # printing and parsing them loses roots that are only known as CRootOf
         generalSolutionTerms = []
         for i, (s,m) in enumerate(realRoots.items()):
             terms = []
             for j in range(0, m):
                 varname = "p_%d_%d" % (i,j)
-                ctx[varname] = sympy.var(varname)
-                terms.append("%s * n**%d" % (varname, j))
+                ctx[varname] = sympy.Symbol(varname)
+                terms.append(ctx[varname] * ctx["n"]**j)
 
-            generalSolutionTerms.append("(%s)*(%s)**n" % (" + ".join(terms), str(s)))
+            generalSolutionTerms.append(sympy.Add(*terms) * s**ctx["n"])
 
-
-        return sympy.sympify(' + '.join(generalSolutionTerms), ctx), ctx
+        return sympy.Add(*generalSolutionTerms), ctx
 
     def _calculateClosedFromGeneralSolution(self, generalSolution, ctx):
         """
@@ -181,7 +434,7 @@ class RecurrenceRelation(object):
         # Create system of equations using initial conditions
         equations = []
         for i,c in self._initialConditions.items():
-            eq = generalSolution - sympy.sympify("(%s)" % str(c))
+            eq = generalSolution - c
             equations.append(eq.subs(ctx["n"], i))
 
         logging.info("Solving the system of linear equations:")
@@ -190,7 +443,8 @@ class RecurrenceRelation(object):
         
         # Solve the system of equation
         solve_symbols = [ e for n, e in ctx.items() if n != "n" ]
-        solutions = linsolve(equations, solve_symbols)
+        with self._stage("linsolve"):
+            solutions = linsolve(equations, solve_symbols)
 
         if len(solutions) == 0:
             raise RecurrenceSolveFailed("No solution to the system of equations to find the alfas could be found.")
@@ -211,358 +465,262 @@ class RecurrenceRelation(object):
 
         return solved
 
-    def _theorem6Classifier(self, expr, ctx, buckets):
+    def _solveNonHomogeneous(self, generalSolution):
         """
-        Classify a single term in the non homogenous part of a recurrence relation.
-        Classification means that that the term will be decomposed into the constant
-        part, a part with a constant to the power of n and n to the power of a constant.
-        
+        get the general solution for a non-homogeneous recurrence relation
+        given the general solution for the associated homogeneous recurrence
 
         Args:
-            expr (sympy expression): The term to classify
-            ctx (dict of string: sympy symbol): The context of the solution
-            buckets (dict of sympy expression: dict of sympy expression: sympy symbol): Contains the classified terms
-                                               in the form (the constant to the power n):
-                                               (n to the power of a constant): (constant)
-        """
-
-        args = expr.args
+            generalSolution (sympy expression): The general solution for the associated homogeneous recurrence
 
-        if expr.func != sympy.Mul:
-            args = [expr]
-        
-        power = sympy.sympify("1", ctx)
-        constant = sympy.sympify("1", ctx)
-        poly = sympy.sympify("0", ctx)
+        Returns:
+            sympy expression: The particular solution plus the general solution of the associated homogeneous recurrence
+        """
+        if self._spec.terms is None:
+            raise RecurrenceSolveFailed("The non homogeneous part \"%s\" is not a sum of terms of the form c * n^d * b^n" % str(self._spec.nonHomogeneous))
 
-        for a in args:
-            if ctx["n"] not in a.atoms():
-                constant = a
-            elif a.func == sympy.Symbol:
-                poly = sympy.sympify("1", ctx)
-            elif a.func == sympy.Pow and a.args[0].func == sympy.Symbol:
-                poly = a.args[1]
-            elif a.func == sympy.Pow and a.args[1].func == sympy.Symbol:
-                power = a.args[0]
+        with self._stage("particular"):
+            particularSolution = ParticularSolver(self._spec.coefficients).solve(self._spec.terms, self._sympy_context["n"])
 
-        if power not in buckets:
-            buckets[power] = {}
+        logging.info("Particular solution: %s" % str(particularSolution))
 
-        buckets[power][poly] = constant
+        return particularSolution + generalSolution
 
-    def _theorem6SolutionBuilder(self, realroots, nonHomogenous, ctx):
+    def _toRational(self, expr):
         """
-        Given the roots of the associated homogenous recurrence relation and the non homogenous part F(n)
-        of the equation build a particular solution of the correct form.
+        Convert a sympy expression to a native python rational number
 
         Args:
-            realRoots (dict of sympy expr: int): The roots of the characteristic equation with multiplicities
-            nonHomogenous (sympy expression): The part of the equation that makes the recurrence non homogenous
-            ctx (dict of string: sympy symbol): The context of the solution to build
-        
+            expr (sympy expression): The expression to convert
+
         Returns:
-            sympy expression: The form of the particular solution
+            int/Fraction: The number, or None if the expression is not a rational number
         """
+        expr = sympy.sympify(expr)
+        if not expr.is_Rational:
+            return None
 
-        nonHomogenous = nonHomogenous.expand()
-
-        buckets = {}
-        if nonHomogenous.func != sympy.Add:
-            self._theorem6Classifier(nonHomogenous, ctx, buckets)
-        else:
-            for arg in nonHomogenous.args:
-                self._theorem6Classifier(arg, ctx, buckets)
-
-        particularSolutionTerms = []
-        for i, (power, polys) in enumerate(buckets.items()):
-            multiplicity = realroots.get(power, 0)
-            highestPoly = max(k for k, v in polys.items())
-            terms = []
-            for j in range(highestPoly, -1, -1):
-                varname = "q_%d_%d" % (i,j)
-                ctx[varname] = sympy.var(varname)
-                terms.append("%s * n**%d" % (varname, j))
-
-            particularSolutionTerms.append("n**%s*(%s)*(%s)**n" % (str(multiplicity), " + ".join(terms), str(power)))
+        if expr.q == 1:
+            return int(expr.p)
 
-        solutionOfCorrectForm = " + ".join(particularSolutionTerms)
+        return Fraction(int(expr.p), int(expr.q))
 
-        logging.info("Buckets from theorem6 classifier: %s" % str(buckets))
-        logging.info("Solution must exist of form: %s" % solutionOfCorrectForm)
-
-        return sympy.sympify(solutionOfCorrectForm, ctx)
-    
-    def _particularSolutionClassifier(self, expr, ctx, buckets):
+    def _getLinearCoefficients(self):
         """
-        Classify a single term of the recurrence relation where the particular solution has been substituted into 
-        Classification means that that the term will be decomposed into buckets of x^n that contains a list of each
-        term with the degree of that x^n.
-        
+        Get the coefficients of a linear recurrence with constant rational coefficients
 
-        Args:
-            expr (sympy expression): The term to classify
-            ctx (dict of string: sympy symbol): The context of the solution
-            buckets (dict of sympy expression: dict of sympy expression: sympy symbol): Contains the classified terms
+        Returns:
+            list of int/Fraction: The coefficient of s(n-i) at position i - 1, or None
+                                  if the recurrence is not of that form
         """
-        args = expr.args
-
-        if expr.func != sympy.Mul:
-            args = [expr]
-        
-        matcherCtx = { "n": ctx["n"], "i": sympy.Wild("i") }
-        matcher = sympy.sympify("n - i", matcherCtx)
-
-        base = sympy.sympify("1", ctx)
-        degree = sympy.sympify("0", ctx)
-        term = expr
+        if self._linearCoefficients is not None:
+            return self._linearCoefficients or None
 
-        for a in args:
-            if a.func == sympy.Pow and len(a.args[0].atoms(sympy.Symbol)) == 0 and len(a.args[1].atoms(sympy.Symbol)) > 0:
-                base = a.args[0]
-                m = a.args[1].match(matcher)
-                degree = m[matcherCtx["i"]]
-                term = term.subs(a, 1) 
-                break
+        self._linearCoefficients = False
+        if self._spec is None:
+            return None
 
-        if base not in buckets:
-            buckets[base] = []
+        coefficients = [self._toRational(c) for c in self._spec.coefficients]
+        if None in coefficients:
+            return None
 
-        buckets[base].append({
-            "term": term,
-            "degree": degree
-        })
+        self._linearCoefficients = coefficients
+        return coefficients
 
-    def _solveParticularCoefficients(self, expr, ctx):
+    def _getNonHomogeneousTerms(self):
         """
-        Solve for the coefficients of the particular solution.
-
-        Args:
-            expr (sympy expression): The recurrence with the particular solution substituted into it
-            ctx (dict of string: sympy symbol): The context of the recurrence with the particular solution substituted into it
+        Get the non homogeneous part of the recurrence as rational polynomial times exponential terms
 
         Returns:
-            (dict of sympy symbol: sympy expressiong): Dict containing values of the coefficients
+            dict of (int/Fraction, int): int/Fraction: The terms in the form (base, degree): constant,
+                                                      or None if the part is not of that form
         """
-        expr = expr.expand()
-
-        logging.info("solving particular expanded: %s" % str(expr))
+        if self._spec is None or self._spec.terms is None:
+            return None
 
-        # built up dict containing
-        buckets = {}
-        if expr.func != sympy.Add:
-            self._particularSolutionClassifier(expr, ctx, buckets)
-        else:
-            for arg in expr.args:
-                self._particularSolutionClassifier(arg, ctx, buckets)
-
-        logging.info("Buckets for solving coefficients of particular: ")
-        for p,b in buckets.items():
-            logging.info("\t%s: %s" % (str(p), str(b)))
-
-        eqs = []
-        for p,b in buckets.items():
-            highestDegree = max([t["degree"] for t in b ])
-            eq = 0
-            for t in b:
-                degreeDiff = highestDegree - t["degree"]
-                eq = eq + p**degreeDiff * (t["term"])
-
-            eqs.append(eq)
-
-        logging.info("Each of the following equations has to be 0")
-        for eq in eqs:
-            logging.info("\t%s" % str(eq))
-
-        # start solving that shit
-        result = {}
-        for eq in eqs:
-            solveSymbols = [ s for s in eq.atoms(sympy.Symbol) if s != ctx["n"] ]
-            res = sympy.solve_undetermined_coeffs(eq, solveSymbols, ctx["n"])
-            if res is None:
-                raise RecurrenceSolveFailed("Could not solve one of the sub equations of the filled in recurrence with the particular solution.")
-                
-            result.update(res)
-
-        return result
-
-    def _solveNonHomogeneous(self, realRoots, homogeneous, nonHomogenous, generalSolution, ctx):
-        """
-        get the closed form equation for a non-homogeneous recurrence relation
-        given the general solution for the associated homogeneous recurrence
+        terms = {}
+        for base, degree, constant in self._spec.terms:
+            base = self._toRational(base)
+            constant = self._toRational(constant)
+            if base is None or constant is None or base == 0:
+                return None
 
-        Args:
-            realRoots (dict of sympy expr: int): The roots of the characteristic equation with multiplicities
-            homogeneous (sympy expression): The associated homogenous equation
-            nonHomogenous (sympy expression): The part of the equation that makes the recurrence non homogenous
-            generalSolution (sympy expression): The general solution for the associated homogeneous recurrence
-            ctx (dict of string: sympy symbol): The context of the general solution
-        
-        Returns:
-            sympy expression: The closed form solved
-        """
+            terms[(base, degree)] = constant
 
-        solveableRecurrence = self._recurrence - sympy.sympify("s(n)", self._sympy_context)
+        return terms
 
-        logging.info("Brought all s(n) to one side for solving: %s" % str(solveableRecurrence))
-
-        particularCtx = {
-            "n": ctx["n"]
-        }
+    def _getCompanionMatrix(self):
+        """
+        Get the companion matrix engine for the recurrence. This is only possible
+        when the recurrence is linear with constant rational coefficients and the non
+        homogeneous part consists of rational polynomial times exponential terms.
 
-        particularSolutionForm = self._theorem6SolutionBuilder(realRoots, nonHomogenous, particularCtx)
+        Returns:
+            CompanionMatrix: The engine, or None if the recurrence is not supported
+        """
+        if self._companionMatrix is not None:
+            return self._companionMatrix or None
 
-        logging.info("Particular solution is of form: %s" % str(particularSolutionForm))
+        self._companionMatrix = False
 
-        for i in range(0, self._degree + 1):
-            particularReplaced = particularSolutionForm.subs(particularCtx["n"], particularCtx["n"] - i)
-            replaceFunction = sympy.sympify("s(n-%d)" % i, self._sympy_context).simplify()
-            solveableRecurrence = solveableRecurrence.subs(replaceFunction, particularReplaced)
+        coefficients = self._getLinearCoefficients()
+        terms = self._getNonHomogeneousTerms()
+        if coefficients is None or terms is None:
+            return None
 
-        logging.info("Substituted the particular solution with the correct form into the recurrence: %s" % str(solveableRecurrence))
+        self._companionMatrix = CompanionMatrix(coefficients, terms)
+        return self._companionMatrix
 
-        # we replace every x^n with a positive constant so we can use some more sympy facilities.
+    def _getStepCompiler(self):
+        """
+        Get the compiler of the right hand side of the recurrence, creating it if that hasn't happened yet
 
-        solution = self._solveParticularCoefficients(solveableRecurrence, particularCtx)
+        Returns:
+            StepCompiler: The compiler, None if the recurrence depends on anything but n and s(n-1), ..., s(n-k)
+        """
+        if self._stepCompiler is None:
+            compiler = StepCompiler(self._recurrence, self._sympy_context["s"], self._sympy_context["n"], self._getDegree())
+            self._stepCompiler = compiler if compiler.isSupported() else False
 
-        logging.info("Solved for the variables: %s" % str(solution))
+        return self._stepCompiler or None
 
-        # All solutions should not have any variables here any more if they have it means
-        # the variable is free so we fill the free variables in with 0 here
-        variables = self._set_free_variables_to_zero(solution)
+    def _getCompiledStepFunction(self):
+        """
+        Get a function that calculates the next value of any recurrence with the right hand side
+        compiled into exact int and Fraction arithmetic
 
-        logging.info("Filled in any free variables as 0: %s" % str(variables))
+        Returns:
+            function(int, sequence of int/Fraction): Calculates the ith value given s(i-1), ..., s(i-k),
+                                                     returns None when a value is not rational.
+                                                     None if the recurrence is not supported
+        """
+        compiler = self._getStepCompiler()
+        if compiler is None:
+            return None
 
-        if solveableRecurrence.subs(variables).simplify() != 0:
-            raise RecurrenceSolveFailed("Filling in solved coefficient for the recurrence where the particular solution has been fillled doesn't lead to a correct equation.")
- 
-        # Fill in the variables into the particular of the correct form
-        particularSolution = particularSolutionForm.subs(variables)
+        function = compiler.getFunction("fraction")
 
-        logging.info("Particular solution filled in with solved variables: %s" % str(particularSolution))
+        def step(i, previous):
+            if not all(isinstance(p, (int, Fraction)) for p in previous):
+                return None
 
-        generalSolution = (particularSolution + generalSolution).simplify()
+            # Irrational functions such as sqrt give floats, undefined values are left to sympy
+            try:
+                value = function(i, *previous)
+            except (ArithmeticError, TypeError, ValueError):
+                return None
 
-        logging.info("Particular solution + general solution: %s" % str(generalSolution))
+            if isinstance(value, Fraction) and value.denominator == 1:
+                value = value.numerator
 
-        solved = self._calculateClosedFromGeneralSolution(generalSolution, ctx)
+            return value if isinstance(value, (int, Fraction)) else None
 
-        return solved
+        return step
 
-    def _analyseExpression(self):
+    def _getStepFunction(self):
         """
-        Analyse recurrence relation to determine certain properties
-        
+        Get a function that calculates the next value of a linear recurrence with constant
+        rational coefficients in native python arithmetic. The non homogeneous part is evaluated
+        natively when it consists of polynomial times exponential terms and through sympy otherwise.
+        Other recurrences are compiled into native python arithmetic as a whole.
+
         Returns:
-            tuple(int, sympy expr, sympy expr, bool): Contains information from the expression
-                int: What degree the equation has
-                sympy expr: the homogeneous part of the equation
-                sympy expr: the non-homogeneous part of the equation
-                bool: whether the recurrence is linear or not
+            function(int, sequence of int/Fraction): Calculates the ith value given s(i-1), ..., s(i-k),
+                                                     returns None when a value is not rational.
+                                                     None if the recurrence is not supported
         """
+        if self._stepFunction is not None:
+            return self._stepFunction or None
+
+        self._stepFunction = False
+
+        coefficients = self._getLinearCoefficients()
+        if coefficients is None:
+            self._stepFunction = self._getCompiledStepFunction() or False
+            return self._stepFunction or None
+
+        terms = self._getNonHomogeneousTerms()
+        if terms is not None:
+            terms = list(terms.items())
+
+            def nonHomogeneousValue(i):
+                value = 0
+                for (base, degree), constant in terms:
+                    power = base**i if i >= 0 else Fraction(base)**i
+                    value += constant * i**degree * power
+                return value
+        else:
+            n = self._sympy_context["n"]
+            nonHomogeneous = self._spec.nonHomogeneous
 
-        homogenous = 0
-        nonHomogenous = 0
-        degree = 0
-        linear = True
+            def nonHomogeneousValue(i):
+                return self._toRational(nonHomogeneous.subs(n, i))
 
-        s = self._sympy_context["s"]
-        n = self._sympy_context["n"]
-        i = sympy.Wild("i")
-
-        for arg in self._recurrence.args:
-            if len(self._recurrence.args) == 1:
-                arg = self._recurrence
-            if arg.has(s):
-                homogenous += arg
-                rec_term = str(arg.find(s(n-i)))
-                try:
-                    term_degree = int(re.search(r'\d+', rec_term).group())
-                    if term_degree > degree:
-                        degree = term_degree
-                    if linear and arg.has(sympy.Pow):
-                        linear = False
-                        break
-                    if linear and arg.func == sympy.Mul:
-                        s_args = arg.args
-                        if (s_args[0].has(s) or s_args[0].has(s)) and (s_args[1].has(s) or s_args[1].has(n)):
-                            linear = False
-                            break
-                except AttributeError:
-                    raise RecurrenceSolveFailed("Failed parsing homogeneous term")
-            else:
-                nonHomogenous += arg
-        return degree, homogenous, nonHomogenous, linear
+        def step(i, previous):
+            value = nonHomogeneousValue(i)
+            if value is None:
+                return None
 
-    def _getDirectKey(self, expr):
-        s = self._sympy_context["s"]
-        # this is still way to hacky, maybe we have to check per step if we can do it or not...
-        if expr.func == s:
-            return expr.args[0].args[0]
-        elif expr.args[1].func == s:
-            return expr.args[1].args[0].args[0]
+            for c, p in zip(coefficients, previous):
+                if not isinstance(p, (int, Fraction)):
+                    return None
+                value += c * p
 
+            if isinstance(value, Fraction) and value.denominator == 1:
+                value = value.numerator
 
-    def _dictBuilder (self, expr, dicts):
-        s = self._sympy_context["s"]
-        # if the function has an add, it means we can loop deeper
-        if expr.func == sympy.Add :
-            for arg in expr.args:
-                self._dictBuilder(arg,dicts)
-        elif expr.func == sympy.Mul:
-            # we always get the value from a multiply function
-            dicts[self._getDirectKey(expr)] =  expr.args[0]
-        elif expr.func == s:
-            # if we found the function directly, it means there is no extra mul, so we have a constant of 1
-            dicts[self._getDirectKey(expr)] =  1
- 
-        return
+            return value
 
-    def _getCharacteristicEquation(self, expr):
+        self._stepFunction = step
+        return step
+
+    def _getCharacteristicEquation(self):
         """
-        Get the characteristic function with a given degree
+        Get the characteristic function of the recurrence
 
         Returns:
             Sympy expression: The characteristic equation
         """    
         r = sympy.Symbol('r')
+        order = self._spec.order
 
-        #build the dictionary where we link every constant to every a_n value
-        dicts = {}
-        self._dictBuilder(self._recurrence, dicts)
-
-        #start building our new expression!
-        newExpr = r**self._degree
-        for i in range(1, self._degree + 1):
-            newExpr = newExpr - dicts.get(-i, 0) * r**(self._degree - i)
+        newExpr = r**order
+        for i, c in enumerate(self._spec.coefficients, 1):
+            newExpr = newExpr - c * r**(order - i)
     
         return newExpr
 
-    def _solve(self):
+    def _solveGeneral(self):
         """
-        Solve the recurrence relation into a closed form
+        Solve the recurrence relation into a general solution which contains a
+        free coefficient for every term of the associated homogeneous solution.
+        The result is stored so it can be shared between initial conditions.
 
         Returns:
-            String: The solved recurrence relation in string format
+            tuple(sympy expression, dict of string: sympy symbol): The general solution and its context
         """
+        if "solution" in self._general:
+            return self._general["solution"], self._general["ctx"]
 
         logging.info("Started solving recurrence relation: %s" % str(self._recurrence))
 
-        self._degree, homogenous, nonHomogenous, linear = self._analyseExpression()
+        if self._spec is None:
+            raise RecurrenceSolveFailed("The equation is not linear with constant coefficients")
+
+        self._getDegree()
+        nonHomogenous = self._spec.nonHomogeneous
 
         msg = "homogenous" if nonHomogenous == 0 else "nonhomogenous"
         logging.info("Analyzation complete, It is a %s recurrence relation with degree %d" % (msg, self._degree))
         if nonHomogenous != 0:
             logging.info("The part that makes the recurrence nonhomogenous is: %s" % str(nonHomogenous))
 
-        if not linear:
-            raise RecurrenceSolveFailed("The equation is not linear")
-
-        characteristicEq = self._getCharacteristicEquation(homogenous)
+        characteristicEq = self._getCharacteristicEquation()
         logging.info("The characteristic equation is: %s" % str(characteristicEq))
        
-        # get roots of characteristic equations and remove
-        # the complex roots
-        realRoots = { s:m for (s,m) in sympy.roots(characteristicEq).items() if sympy.I not in s.atoms() }
+        # get the real roots of characteristic equations
+        with self._stage("roots"):
+            realRoots = self._rootFinder.getRealRoots(self._spec.coefficients)
         logging.info("With roots: multiplicities: %s" % str(realRoots))
 
         # the sum of the multiplicity must be the same as the degree
@@ -574,72 +732,1119 @@ class RecurrenceRelation(object):
         generalSolution, ctx = self._getGeneralSolution(realRoots)
         logging.info("The general solution has the form: %s" % str(generalSolution))
 
-        solved = sympy.sympify("0")
-        if nonHomogenous == 0:
-            solved = self._calculateClosedFromGeneralSolution(generalSolution, ctx)
+        if nonHomogenous != 0:
+            with self._stage("nonHomogeneous"):
+                generalSolution = self._solveNonHomogeneous(generalSolution)
+
+        self._general["solution"] = generalSolution
+        self._general["ctx"] = ctx
+        self._general["roots"] = list(realRoots.items())
+        self._general["systems"] = {}
+
+        return generalSolution, ctx
+
+    def _getInitialConditionSystem(self, indices):
+        """
+        Get the system of equations that determines the coefficients of the general
+        solution from initial conditions at the given indices. At consecutive indices
+        this is a confluent Vandermonde system in the roots which is solved directly,
+        otherwise the system is inverted once in exact arithmetic over the field of the
+        roots. The system is shared between all initial conditions at the same indices.
+
+        Args:
+            indices (tuple of int): The indices of the initial conditions
+
+        Returns:
+            tuple(list of sympy symbol, function, list of sympy expression): The coefficients, a function
+                that solves the system for a list of right hand sides and the value of the particular
+                solution at each index. None if the system doesn't have a unique solution.
+        """
+        generalSolution, ctx = self._solveGeneral()
+        systems = self._general["systems"]
+
+        if indices not in systems:
+            n = ctx["n"]
+            symbols = [ e for name, e in ctx.items() if name != "n" ]
+            particular = generalSolution.subs({ symbol: 0 for symbol in symbols })
+            offsets = [ particular.subs(n, i) for i in indices ]
+            systems[indices] = None
+
+            consecutive = indices == tuple(range(indices[0], indices[0] + len(indices)))
+            if len(symbols) == len(indices) and consecutive:
+                systems[indices] = (symbols, ConfluentVandermonde(self._spec.coefficients, self._general["roots"], indices[0]).solve, offsets)
+            elif len(symbols) == len(indices):
+                basis = [ generalSolution.diff(symbol) for symbol in symbols ]
+                matrix = sympy.Matrix([[ b.subs(n, i) for b in basis ] for i in indices ]).to_DM(extension = True).to_field()
+                if matrix.rank() == len(indices):
+                    inverse = matrix.inv().to_Matrix()
+                    solve = lambda values: list((inverse * sympy.Matrix(values)).applyfunc(sympy.expand))
+                    systems[indices] = (symbols, solve, offsets)
+
+            if systems[indices] is None:
+                logging.info("The system of equations for the initial conditions doesn't have a unique solution")
+
+        return systems[indices]
+
+    def _getCollectedBasis(self):
+        """
+        Get the particular solution and every basis term of the homogeneous solution collected
+        by the normalizer. They are shared between all initial conditions, so normalizing a
+        closed form only has to combine the coefficients.
+
+        Returns:
+            list of tuple: The collected particular solution followed by the collected basis terms
+        """
+        if "collected" not in self._general:
+            generalSolution, ctx = self._solveGeneral()
+            symbols = [ e for name, e in ctx.items() if name != "n" ]
+            particular = generalSolution.subs({ symbol: 0 for symbol in symbols })
+            basis = [ generalSolution.diff(symbol) for symbol in symbols ]
+            self._general["collected"] = [ self._normalizer.collect(e) for e in [particular] + basis ]
+
+        return self._general["collected"]
+
+    def _calculateClosedFromSystem(self, system):
+        """
+        get the closed form equation by solving the system of equations for the initial conditions.
+        The coefficients are kept so simplifying only combines the shared collected basis terms.
+
+        Args:
+            system (tuple): The system as returned by _getInitialConditionSystem
+
+        Returns:
+            sympy expression: The closed form solved
+        """
+        generalSolution, _ = self._solveGeneral()
+        symbols, solve, offsets = system
+        indices = sorted(self._initialConditions)
+
+        coefficients = solve([ sympy.expand(self._initialConditions[i] - o) for i, o in zip(indices, offsets) ])
+
+        solution = dict(zip(symbols, coefficients))
+        logging.info("Solved the system of equations: %s", solution)
+
+        self._combination = (self._getCollectedBasis(), [sympy.Integer(1)] + coefficients)
+        return generalSolution.xreplace(solution)
+
+    def _solveCharacteristic(self):
+        """
+        Solve the recurrence relation through the roots of its characteristic equation. The
+        general solution is shared between all initial conditions.
+
+        Returns:
+            sympy expression: The unsimplified closed form
+        """
+        generalSolution, ctx = self._solveGeneral()
+
+        with self._stage("initialConditions"):
+            system = self._getInitialConditionSystem(tuple(sorted(self._initialConditions)))
+            if system is not None:
+                return self._calculateClosedFromSystem(system)
+
+            return self._calculateClosedFromGeneralSolution(generalSolution, ctx)
+
+    def _getAnnihilatedEquation(self):
+        """
+        Get the characteristic equation of the homogeneous recurrence that annihilates the
+        non homogeneous terms c * n^d * b^n by multiplying with (r - b)^(d+1)
+
+        Returns:
+            sympy Poly: The characteristic equation in r
+        """
+        r = sympy.Symbol('r')
+
+        highestDegrees = {}
+        for base, degree, _ in self._spec.terms:
+            highestDegrees[base] = max(degree, highestDegrees.get(base, 0))
+
+        annihilated = sympy.Poly(self._getCharacteristicEquation(), r)
+        for base, degree in highestDegrees.items():
+            annihilated *= sympy.Poly((r - base)**(degree + 1), r)
+
+        return annihilated
+
+    def _solveGeneratingFunction(self):
+        """
+        Solve the recurrence relation through its generating function. The non homogeneous
+        terms c * n^d * b^n are annihilated by (1 - b * x)^(d+1), so the generating function of
+        the sequence is Q(x) / R(x) where R(x) belongs to the annihilated homogeneous recurrence
+        and Q(x) follows from the first values. The closed form is its partial fraction expansion.
+
+        Returns:
+            sympy expression: The unsimplified closed form
+        """
+        if self._spec is None:
+            raise RecurrenceSolveFailed("The equation is not linear with constant coefficients")
+        if self._spec.terms is None:
+            raise RecurrenceSolveFailed("The non homogeneous part \"%s\" is not a sum of terms of the form c * n^d * b^n" % str(self._spec.nonHomogeneous))
+
+        indices = sorted(self._initialConditions)
+        if indices != list(range(indices[0], indices[0] + self._getDegree())):
+            raise RecurrenceSolveFailed("The generating function needs %d consecutive initial conditions" % self._degree)
+
+        n = self._sympy_context["n"]
+        annihilated = self._getAnnihilatedEquation()
+        coefficients = tuple(-c for c in annihilated.all_coeffs()[1:])
+
+        with self._stage("roots"):
+            roots = self._rootFinder.getRealRoots(coefficients)
+
+        if sum(roots.values()) != len(coefficients):
+            raise RecurrenceSolveFailed("The generating function \"%s\" has complex poles" % str(annihilated.as_expr()))
+
+        with self._stage("generatingFunction"):
+            values = [ sympy.sympify(v) for v in self.iterValues(indices[0], indices[0] + len(coefficients)) ]
+            roots = list(roots.items())
+            # The system only depends on the first index, it is shared between initial conditions
+            systems = self._general.setdefault("generatingFunctionSystems", {})
+            if indices[0] not in systems:
+                systems[indices[0]] = ConfluentVandermonde(coefficients, roots, indices[0])
+            solution = systems[indices[0]].solve(values)
+
+            terms = []
+            solution = iter(solution)
+            for root, multiplicity in roots:
+                terms.append(sympy.Add(*[ next(solution) * n**j for j in range(0, multiplicity) ]) * root**n)
+
+        return sympy.Add(*terms)
+
+    def _solveWith(self, engine):
+        """
+        Solve the recurrence relation with a single engine
+
+        Args:
+            engine (string): The name of the engine
+
+        Returns:
+            sympy expression: The unsimplified closed form
+        """
+        return getattr(self, self._engines[engine])()
+
+    def _getShape(self):
+        """
+        Get the shape of the relation that decides which engine is fastest
+
+        Returns:
+            string: The order, the amount of non homogeneous bases and their highest power of n
+        """
+        if self._spec is None:
+            return "nonlinear"
+
+        terms = self._spec.terms or ()
+        return "%d:%d:%d" % (self._spec.order, len(set(b for b, _, _ in terms)), max([d for _, d, _ in terms], default = -1))
+
+    def _getEngineWins(self):
+        """
+        Get how often every engine won a race for relations of this shape
+
+        Returns:
+            dict of string: int: The wins per engine
+        """
+        if self._cache is not None:
+            return self._cache.getWins(self._getShape())
+
+        return dict(self._engineWins.get(self._getShape(), {}))
+
+    @classmethod
+    def getEngineWinRates(cls):
+        """
+        Get the fraction of the races every engine won per shape of relation in this process
+
+        Returns:
+            dict of string: dict of string: float: The win rate per engine per shape
+        """
+        return { shape: { e: w / sum(wins.values()) for e, w in wins.items() } for shape, wins in cls._engineWins.items() }
+
+    def _getDefaultEngine(self):
+        """
+        Get the engine that won most races for relations of this shape
+
+        Returns:
+            string: The name of the engine, the characteristic engine when there weren't any races
+        """
+        wins = self._getEngineWins()
+        return max(self._engines, key = lambda e: (wins.get(e, 0), e == "characteristic"))
+
+    def _verifyClosedForm(self, expr):
+        """
+        Check a closed form against the recurrence at the initial conditions and the values after them
+
+        Args:
+            expr (sympy expression): The closed form
+
+        Returns:
+            bool: Whether the closed form is correct at those values
+        """
+        n = self._sympy_context["n"]
+        values = list(self._initialConditions.items())
+
+        # the recurrence can only be continued when the last initial conditions are consecutive
+        last = max(self._initialConditions)
+        if all(last - j in self._initialConditions for j in range(0, self._getDegree())):
+            values.extend(enumerate(self.iterValues(last + 1, last + self._degree + 1), last + 1))
+
+        for i, value in values:
+            difference = expr.subs(n, i) - value
+            if difference.free_symbols:
+                if self._normalizer._normalizeConstant(difference) != 0:
+                    return False
+            elif abs(difference.evalf(50)) > 10**-30 * max(1, abs(sympy.sympify(value).evalf(50))):
+                return False
+
+        return True
+
+    def _race(self):
+        """
+        Solve the recurrence relation with every engine at the same time in separate processes.
+        The first verified closed form is used, the other engines are stopped.
+
+        Returns:
+            tuple(string, sympy expression): The engine that won and its unsimplified closed form
+        """
+        running = {}
+        for engine in self._engines:
+            receiver, sender = multiprocessing.Pipe(duplex = False)
+            process = multiprocessing.Process(target = _engineWorker, args = (sender, self, engine), daemon = True)
+            process.start()
+            sender.close()
+            running[receiver] = (engine, process)
+
+        winner = None
+        try:
+            while winner is None and len(running) > 0:
+                for receiver in multiprocessing.connection.wait(list(running)):
+                    engine, process = running.pop(receiver)
+                    try:
+                        solved = receiver.recv()
+                    except EOFError:
+                        solved = None
+                    receiver.close()
+                    process.join()
+
+                    if solved is not None and self._verifyClosedForm(solved):
+                        winner = (engine, solved)
+                        break
+                    logging.info("The %s engine didn't find a correct closed form" % engine)
+        finally:
+            for receiver, (engine, process) in running.items():
+                process.terminate()
+                process.join()
+                receiver.close()
+
+        if winner is None:
+            raise RecurrenceSolveFailed("None of the engines could solve the recurrence")
+
+        logging.info("The %s engine won the race" % winner[0])
+        shape = self._getShape()
+        wins = self._engineWins.setdefault(shape, {})
+        wins[winner[0]] = wins.get(winner[0], 0) + 1
+        if self._cache is not None:
+            self._cache.recordWin(shape, winner[0])
+
+        return winner
+
+    def _solve(self):
+        """
+        Solve the recurrence relation into a closed form
+
+        Returns:
+            String: The solved recurrence relation in string format
+        """
+        engine = self._engine if self._engine is not None else self._getDefaultEngine()
+        self._combination = None
+        if engine == "race":
+            engine, solved = self._race()
+        elif engine in self._engines:
+            try:
+                solved = self._solveWith(engine)
+            except RecurrenceSolveFailed:
+                # An engine that was only picked because it won races for this shape may not be able
+                # to solve this relation, then it is solved as if there were no races
+                if self._engine is not None or engine == "characteristic":
+                    raise
+                logging.info("The %s engine failed, solving with the characteristic engine" % engine)
+                engine = "characteristic"
+                solved = self._solveWith(engine)
         else:
-            solved = self._solveNonHomogeneous(realRoots, homogenous, nonHomogenous, generalSolution, ctx)
-        
-        logging.info("Solved raw: %s" % str(solved))
-        solved = solved.simplify()
-        logging.info("Solved simplified: %s" % str(solved))
+            raise ValueError("Unknown engine \"%s\", expected %s or race" % (engine, ", ".join(self._engines)))
+        self._solvedBy = engine
 
-        return solved
+        logging.info("Solved raw: %s", solved)
+        with self._stage("simplify"):
+            simplified = self._simplify(solved)
+
+        self._simplified = simplified is not None
+        if not self._simplified:
+            return solved
+
+        logging.info("Solved simplified: %s", simplified)
+        return simplified
+
+    def _getCacheKey(self, pretty = False):
+        """
+        Get a key that identifies the recurrence relation with its initial conditions
+
+        Args:
+            pretty (bool): Whether the closed form is simplified with sympy's generic simplify()
 
-    def solve(self):
+        Returns:
+            string: Hash of the spec, or the expanded recurrence when it has none, the initial conditions
+                    and whether the closed form is pretty
+        """
+        canonical = [self._spec.key() if self._spec is not None else sympy.srepr(self._recurrence)]
+        if pretty:
+            canonical.append("pretty")
+        for k, v in sorted(self._initialConditions.items()):
+            canonical.append("%d:%s" % (k, sympy.srepr(v)))
+
+        return hashlib.sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+
+    def solve(self, cache = None, stats = None, budget = None, background = False, pretty = False, engine = None):
         """
         Get the recurrence relation into a closed form
 
+        Args:
+            cache (SolveCache): Persistent cache of closed forms to consult before solving
+            stats (SolveStats): Records the time and memory spent in every stage of solving
+            budget (float): The amount of seconds after which simplification is skipped, the closed form
+                            is then correct but not simplified. 0 never simplifies, None for no limit
+            background (bool): Simplify the closed form in a background thread when the budget ran out
+            pretty (bool): Also run sympy's generic simplify() on the closed form, this is
+                           much slower than the normalization that is always done
+            engine (string): The engine to solve with, "characteristic" or "generatingFunction". "race" runs
+                             them in parallel processes and keeps the first verified closed form. None picks
+                             the engine that won most races for relations of the same shape
+
         Returns:
             String: The solved recurrence relation in string format
         """
+        if stats is not None:
+            self._stats = stats
+            try:
+                with self._stage("solve"):
+                    return self.solve(cache, None, budget, background, pretty, engine)
+            finally:
+                self._stats = None
+
+        if self._closedForm is None and cache is not None:
+            with self._stage("cache"):
+                cached = cache.get(self._getCacheKey(pretty))
+            if cached is not None:
+                logging.info("Found closed form in the cache")
+                self._closedForm = sympy.sympify(cached)
+
         if self._closedForm is None:
-            self._closedForm = self._solve()
+            self._deadline = time.monotonic() + budget if budget is not None else None
+            self._pretty = pretty
+            self._engine = engine
+            self._cache = cache
+            try:
+                self._closedForm = self._solve()
+            finally:
+                self._deadline = None
+                self._pretty = False
+                self._engine = None
+                self._cache = None
+                self._combination = None
+
+            # only simplified closed forms are cached so a later solve can still simplify
+            if cache is not None and self._simplified:
+                cache.put(self._getCacheKey(pretty), sympy.srepr(self._closedForm))
+            if background and not self._simplified:
+                self._simplifyThread = threading.Thread(target = self._simplifyClosedForm, args = (pretty,), daemon = True)
+                self._simplifyThread.start()
 
         return self._from_sympy(self._closedForm)
 
-    def calculateValueFromSolved(self, n):
+    def _simplifyClosedForm(self, pretty):
+        """
+        Simplify the closed form and replace it when it hasn't changed in the meantime
+
+        Args:
+            pretty (bool): Also run sympy's generic simplify()
+        """
+        closedForm = self._closedForm
+        simplified = self._normalizer.simplify(closedForm, pretty)
+        if self._closedForm is closedForm:
+            self._closedForm = simplified
+            self._closedFormFunctions = {}
+            self._simplified = True
+
+    def waitForSimplification(self, timeout = None):
+        """
+        Wait for the background simplification of the closed form to finish
+
+        Args:
+            timeout (float): The maximum amount of seconds to wait, None to wait until it's done
+
+        Returns:
+            bool: Whether the closed form is simplified
+        """
+        if self._simplifyThread is not None:
+            self._simplifyThread.join(timeout)
+
+        return self._simplified
+
+    def _getQuadraticEvaluator(self):
+        """
+        Get the exact evaluator of the closed form, creating it if that hasn't happened yet
+
+        Returns:
+            QuadraticEvaluator: The evaluator, None if the closed form isn't in a quadratic field
+        """
+        self.solve()
+
+        if self._quadraticEvaluator is None:
+            try:
+                self._quadraticEvaluator = QuadraticEvaluator(self._closedForm, self._sympy_context["n"])
+            except ValueError as e:
+                logging.info("The closed form can't be evaluated exactly: %s" % str(e))
+                self._quadraticEvaluator = False
+
+        return self._quadraticEvaluator or None
+
+    def calculateExactValueFromSolved(self, n):
+        """
+        Get the exact nth value from the solved recurrence relation. Closed forms whose roots
+        and constants lie in a single quadratic field Q(sqrt(d)) are evaluated in that field,
+        other closed forms are evaluated symbolically.
+
+        Args:
+            n (int): The nth value to calculate
+
+        Returns:
+            int/Fraction/sympy expr: The result, rational values are native python numbers
+        """
+        evaluator = self._getQuadraticEvaluator()
+        if evaluator is not None:
+            return evaluator.evaluate(n)
+
+        value = sympy.expand(self._closedForm.subs(self._sympy_context["n"], n))
+        return self._toRational(value) if value.is_Rational else value
+
+    def calculateValueFromSolved(self, n, precision = 100):
         """
         Get the nth value from the solved recurrence relation
 
         Args:
             n (int): The nth value to calculate
-        
+            precision (int): The amount of significant digits of the result
+
         Returns:
             float: The result
         """
+        evaluator = self._getQuadraticEvaluator()
+        if evaluator is not None:
+            return sympy.sympify(evaluator.evaluate(n)).evalf(precision)
+
+        return self._closedForm.subs(self._sympy_context["n"], n).evalf(precision)
+
+    def proveClosedForm(self):
+        """
+        Prove that the closed form is the solution of the recurrence relation. It must satisfy the
+        recurrence identically in n and agree with the initial conditions and with the values that
+        the recurrence continues from.
+
+        Returns:
+            bool: True if it is proven, False if it is disproven, None if that can't be decided exactly
+        """
         self.solve()
-        return self._closedForm.subs(self._sympy_context["n"], n).evalf(100)
 
+        s = self._sympy_context["s"]
+        n = self._sympy_context["n"]
+        prover = ClosedFormProver(self._recurrence, s, n)
+
+        # The closed form is checked on the values the recurrence starts from before checking the recurrence
+        # itself, a wrong closed form usually fails there already
+        proven = True
+        last = max(self._initialConditions)
+        indices = sorted(set(self._initialConditions) | set(range(last - self._getDegree() + 1, last + 1)))
+        for i in indices:
+            try:
+                value = self._calculateExactValueFromRecurrence(i)
+            except ValueError:
+                # The values between non consecutive initial conditions aren't defined
+                value = None
+            if value is None:
+                proven = None
+                continue
+
+            solved = self.calculateExactValueFromSolved(i)
+            if isinstance(value, (int, Fraction)) and isinstance(solved, (int, Fraction)):
+                zero = value == solved
+            else:
+                zero = prover.isZero(sympy.sympify(value) - sympy.sympify(solved))
+
+            if zero is False:
+                return False
+            if zero is None:
+                proven = None
 
-    def calculateValueFromRecurrence(self, n):
+        identity = prover.isSolution(self._closedForm)
+        if identity is False:
+            return False
+        return proven if identity else None
+
+    def _digitsFor(self, magnitude, tolerance):
         """
-        Get the nth value from the recurrence relation without solving it
+        Get the amount of significant digits needed to represent a value within a tolerance
+
+        Args:
+            magnitude (float/mpf): An upper bound of the absolute value
+            tolerance (float): The maximum absolute error
+
+        Returns:
+            int: The amount of digits, with a few guard digits
+        """
+        if magnitude == 0:
+            return 15
+        return max(15, int(mpmath.ceil(mpmath.log10(mpmath.mpf(magnitude) / tolerance))) + 3)
+
+    def _approximate(self, value, tolerance):
+        """
+        Approximate an exact value as a float64 when that is within the tolerance and as an mpf
+        of just enough digits otherwise
+
+        Args:
+            value (int/Fraction/sympy expr): The exact value
+            tolerance (float): The maximum absolute error
+
+        Returns:
+            tuple(float/mpf, int): The approximation and the amount of significant digits used, 15 for float64
+        """
+        if isinstance(value, (int, Fraction)):
+            try:
+                approximation = float(value)
+            except OverflowError:
+                approximation = numpy.inf
+
+            # Rounding to float64 is off by at most half an ulp
+            if numpy.isfinite(approximation) and abs(approximation) * 2.0**-53 <= tolerance:
+                return approximation, 15
+
+            digits = self._digitsFor(mpmath.mpf(value.numerator) / value.denominator if isinstance(value, Fraction) else value, tolerance)
+            with mpmath.workdps(digits):
+                return mpmath.mpf(value.numerator) / value.denominator if isinstance(value, Fraction) else mpmath.mpf(value), digits
+
+        # evalf guarantees its amount of significant digits
+        value = sympy.sympify(value)
+        digits = self._digitsFor(abs(value.evalf(15)), tolerance)
+        approximation = value.evalf(digits)
+        if digits == 15:
+            return float(approximation), 15
+        with mpmath.workdps(digits):
+            return mpmath.mpf(approximation), digits
+
+    def _getClosedFormTerms(self):
+        """
+        Get the terms of the closed form compiled into a float64 callable
+
+        Returns:
+            function: Calculates the list of terms given n
+        """
+        if "terms" not in self._closedFormFunctions:
+            terms = sympy.Add.make_args(self._evaluateRoots(self._closedForm, 17))
+            self._closedFormFunctions["terms"] = (sympy.lambdify(self._sympy_context["n"], list(terms), "math"), 17)
+
+        return self._closedFormFunctions["terms"][0]
+
+    def calculateAdaptiveValueFromSolved(self, n, tolerance):
+        """
+        Get the nth value from the solved recurrence relation with the least work that meets a tolerance.
+        The closed form is evaluated in float64 first, the rounding error is bounded by the sum of the
+        absolute values of its terms. When that bound exceeds the tolerance it is evaluated with as many
+        digits as the magnitude of the terms requires. Closed forms in a quadratic field are evaluated
+        exactly and rounded once.
 
         Args:
             n (int): The nth value to calculate
-        
+            tolerance (float): The maximum absolute error of the result
+
         Returns:
-            float: The result
+            tuple(float/mpf, int): The result and the amount of significant digits used, 15 for float64
+        """
+        evaluator = self._getQuadraticEvaluator()
+        if evaluator is not None:
+            return self._approximate(evaluator.evaluate(n), tolerance)
+
+        magnitude = None
+        try:
+            terms = [float(t) for t in self._getClosedFormTerms()(n)]
+            magnitude = sum(abs(t) for t in terms)
+
+            # Every operation adds a relative error of at most 2^-53, the roots are rounded too and
+            # their rounding error grows with the power n
+            bound = magnitude * 2.0**-53 * (len(terms) + abs(n) + 16)
+            if numpy.isfinite(magnitude) and bound <= tolerance:
+                return sum(terms), 15
+        except (ArithmeticError, TypeError, ValueError):
+            pass
+
+        value = self._closedForm.subs(self._sympy_context["n"], n)
+        if magnitude is None or not numpy.isfinite(magnitude):
+            magnitude = sum(abs(t.evalf(15)) for t in sympy.Add.make_args(sympy.expand(value)))
+
+        digits = self._digitsFor(magnitude, tolerance)
+        with mpmath.workdps(digits):
+            return mpmath.mpf(value.evalf(digits)), digits
+
+    def _toResidue(self, value, m):
+        """
+        Reduce a rational value modulo m
+
+        Args:
+            value (sympy Rational or Fraction or int): The value
+            m (int): The modulus
+
+        Returns:
+            int: The residue of the value
+        """
+        value = Fraction(int(sympy.numer(value)), int(sympy.denom(value))) if isinstance(value, sympy.Basic) else Fraction(value)
+        try:
+            return value.numerator * pow(value.denominator, -1, m) % m
+        except ValueError:
+            raise ValueError("The denominator of %s is not invertible modulo %d" % (str(value), m))
+
+    def calculateValueModulo(self, n, m):
+        """
+        Get the nth value modulo m of a linear recurrence with rational constant coefficients
+        without solving it. The non homogeneous terms are annihilated so the sequence satisfies
+        a homogeneous recurrence of order k, which is evaluated with Kitamasa's method in
+        O(k^2 log n) operations, so n can be far beyond what iterating or solving can reach.
+
+        Args:
+            n (int): The nth value to calculate
+            m (int): The modulus, the denominators of the recurrence and of the values must be invertible modulo m
+
+        Returns:
+            int: The nth value modulo m
+        """
+        if m < 1:
+            raise ValueError("The modulus must be positive")
+        if self._spec is None:
+            raise ValueError("The equation is not linear with constant coefficients")
+        if self._spec.terms is None:
+            raise ValueError("The non homogeneous part \"%s\" is not a sum of terms of the form c * n^d * b^n" % str(self._spec.nonHomogeneous))
+
+        if self._annihilated is None:
+            coefficients = tuple(-c for c in self._getAnnihilatedEquation().all_coeffs()[1:])
+            if not all(c.is_Rational for c in coefficients):
+                raise ValueError("The annihilated recurrence has irrational coefficients")
+
+            # The annihilated recurrence holds from the window before the last initial condition on
+            start = max(self._initialConditions) - self._getDegree() + 1
+            values = list(self.iterValues(start, start + len(coefficients)))
+            if any(v is None for v in values):
+                raise ValueError("The %d values before the last initial condition are needed" % self._getDegree())
+            self._annihilated = (coefficients, start, values)
+
+        coefficients, start, values = self._annihilated
+        if n < start:
+            if n in self._initialConditions:
+                return self._toResidue(self._initialConditions[n], m)
+            raise ValueError("The recurrence is not defined at n = %d" % n)
+
+        recurrence = ModularRecurrence([self._toResidue(c, m) for c in coefficients], m)
+        return recurrence.valueAt(n - start, [self._toResidue(v, m) for v in values])
+
+    def _evaluateRoots(self, expr, precision):
+        """
+        Replace the roots that are only known as CRootOf by their numeric value, the
+        compiled backends can't evaluate them
+
+        Args:
+            expr (sympy expression): The expression
+            precision (int): The amount of decimal digits of the roots
+
+        Returns:
+            sympy expression: The expression with numeric roots
+        """
+        return expr.xreplace({ r: r.evalf(precision) for r in expr.atoms(sympy.CRootOf) })
+
+    def _getClosedFormFunction(self, backend, precision = 17):
+        """
+        Get the closed form compiled into a python callable for the given backend
+
+        Args:
+            backend (string): The backend to compile for, either "numpy", "mpmath" or "c"
+            precision (int): The amount of decimal digits of roots that are only known as CRootOf
+
+        Returns:
+            function: The compiled closed form taking n as argument
+        """
+        self.solve()
+
+        # a function compiled with more precise roots can be reused
+        if backend not in self._closedFormFunctions or self._closedFormFunctions[backend][1] < precision:
+            closedForm = self._evaluateRoots(self._closedForm, precision)
+            if backend == "c":
+                function = self._nativeCompiler.compile(closedForm, self._sympy_context["n"])
+            else:
+                function = sympy.lambdify(self._sympy_context["n"], closedForm, backend)
+            self._closedFormFunctions[backend] = (function, precision)
+
+        return self._closedFormFunctions[backend][0]
+
+    def calculateValuesFromSolved(self, values, backend = "numpy", precision = 100):
+        """
+        Get many values from the solved recurrence relation in a single vectorized call
+
+        Args:
+            values (range or array of int): The values of n to calculate
+            backend (string): "numpy" to calculate in float64, "mpmath" to calculate
+                              with the given precision, "c" to calculate in float64 with
+                              the closed form compiled to native code
+            precision (int): The amount of decimal digits used by the mpmath backend
+
+        Returns:
+            numpy array: The results, of dtype float64 for numpy and c and of mpf objects for mpmath
+        """
+        if backend == "c":
+            return self._getClosedFormFunction(backend)(numpy.asarray(values, dtype = numpy.float64))
+        elif backend == "numpy":
+            n = numpy.asarray(values, dtype = numpy.float64)
+            result = self._getClosedFormFunction(backend)(n)
+            # A closed form that doesn't depend on n compiles to a scalar
+            return numpy.broadcast_to(numpy.asarray(result, dtype = numpy.float64), n.shape).copy()
+        elif backend == "mpmath":
+            closedForm = self._getClosedFormFunction(backend, precision)
+            function = numpy.frompyfunc(lambda i: mpmath.mpf(closedForm(mpmath.mpf(int(i)))), 1, 1)
+            with mpmath.workdps(precision):
+                return function(numpy.asarray(values, dtype = object))
+
+        raise ValueError("Unknown backend \"%s\", expected numpy, mpmath or c" % backend)
+
+    def exportClosedForm(self, language = "c", name = "closed_form"):
+        """
+        Get the closed form as straight-line source code. The C function evaluates count values of n at once,
+        void name(const double *n, double *out, long count), the python function a single n
+
+        Args:
+            language (string): "c" or "python"
+            name (string): The name of the function
+
+        Returns:
+            string: The source code
+        """
+        self.solve()
+
+        closedForm = self._evaluateRoots(self._closedForm, 17)
+        if language == "c":
+            return self._nativeCompiler.getCSource(closedForm, self._sympy_context["n"], name)
+        elif language == "python":
+            return self._nativeCompiler.getPythonSource(closedForm, self._sympy_context["n"], name)
+
+        raise ValueError("Unknown language \"%s\", expected c or python" % language)
+
+    def getSymbolicClosedForm(self):
+        """
+        Get the closed form where the initial conditions are replaced by the symbols
+        a0, a1, ... in the order of their indices
+
+        Returns:
+            String: The solved recurrence relation in string format
+        """
+        indices = sorted(self._initialConditions)
+        return self.withInitialConditions({ i: "a%d" % j for j, i in enumerate(indices) }).solve()
+
+    def _getConditionMap(self):
+        """
+        Get the linear map from the initial conditions to the coefficients of the general
+        solution together with the general solution compiled into numpy callables
+
+        Returns:
+            tuple(numpy array, numpy array, function): The inverse of the system of equations,
+                the value of the particular solution at every initial index and a function
+                that calculates the particular solution followed by every basis term of the
+                homogeneous solution for an array of n
+        """
+        indices = tuple(sorted(self._initialConditions))
+        system = self._getInitialConditionSystem(indices)
+        if system is None:
+            raise RecurrenceSolveFailed("The initial conditions don't determine a unique solution.")
+
+        maps = self._general.setdefault("conditionMaps", {})
+        if indices not in maps:
+            generalSolution, ctx = self._solveGeneral()
+            symbols, solve, offsets = system
+
+            # The inverse of the system has the solutions for the unit vectors as columns
+            identity = [ [ sympy.Integer(1 if i == j else 0) for i in range(0, len(symbols)) ] for j in range(0, len(symbols)) ]
+            inverse = sympy.Matrix(list(map(solve, identity))).T
+
+            basis = [ generalSolution.diff(symbol) for symbol in symbols ]
+            particular = generalSolution.subs({ symbol: 0 for symbol in symbols })
+
+            maps[indices] = (
+                numpy.array(self._evaluateRoots(inverse, 17).evalf(), dtype = numpy.float64),
+                numpy.array([ float(o) for o in offsets ], dtype = numpy.float64),
+                sympy.lambdify(ctx["n"], [ self._evaluateRoots(e, 17) for e in [particular] + basis ], "numpy")
+            )
+
+        return maps[indices]
+
+    def calculateValuesFromInitialConditions(self, conditions, values):
+        """
+        Get values of the solved recurrence relation for many sets of initial conditions at once.
+        The recurrence is solved once and every set of initial conditions is mapped linearly onto
+        the coefficients of the general solution, so the evaluation is a single matrix product.
+
+        Args:
+            conditions (array of float): A set of initial conditions per row, ordered by index
+            values (range or array of int): The values of n to calculate
+
+        Returns:
+            numpy array: The float64 results with a row per set of initial conditions and a column per n
+        """
+        inverse, offsets, function = self._getConditionMap()
+
+        conditions = numpy.atleast_2d(numpy.asarray(conditions, dtype = numpy.float64))
+        n = numpy.asarray(values, dtype = numpy.float64)
+
+        # Terms that don't depend on n compile to scalars
+        terms = [ numpy.broadcast_to(numpy.asarray(t, dtype = numpy.float64), n.shape) for t in function(n) ]
+        particular, basis = terms[0], numpy.array(terms[1:]).reshape(len(offsets), n.size)
+
+        coefficients = (conditions - offsets) @ inverse.T
+        return particular.reshape(n.size) + coefficients @ basis
+
+
+    def _getDegree(self):
+        """
+        Get the degree of the recurrence, determining it if that hasn't happened yet
+
+        Returns:
+            int: The degree
+        """
+        if self._degree is None:
+            if self._spec is not None:
+                self._degree = self._spec.order
+            else:
+                n = self._sympy_context["n"]
+                shifts = [n - f.args[0] for f in self._recurrence.atoms(self._sympy_context["s"])]
+                self._degree = max([int(i) for i in shifts if i.is_Integer], default = 0)
+
+        return self._degree
+
+    def _nearestStart(self, n):
+        """
+        Find the closest index at or before n from where the recurrence can be continued.
+        This is the last initial condition, the last memoized value, a checkpoint or the newest value.
+
+        Args:
+            n (int): The index that has to be calculated
+
+        Returns:
+            tuple(int, list of int/Fraction/sympy expr): The index and the values s(index), ..., s(index-k+1)
+        """
+        degree = self._getDegree()
+
+        start = max(self._initialConditions)
+        if self._memoize:
+            start = max(self._solvedValues)
+
+        checkpoints = [i for i in self._checkpoints if start < i <= n]
+        if len(checkpoints) > 0:
+            start = max(checkpoints)
+
+        if self._cursor is not None and start < self._cursor[0] <= n:
+            return self._cursor[0], list(self._cursor[1])
+        if start in self._checkpoints:
+            return start, list(self._checkpoints[start])
+
+        return start, [self._solvedValues.get(start - j) for j in range(0, degree)]
+
+    def _iterateFrom(self, start, window):
+        """
+        Lazily calculate the values following a known window of values. Only the last
+        degree values are kept in memory unless memoization is enabled.
+
+        Args:
+            start (int): The index of the newest value in the window
+            window (list of int/Fraction/sympy expr): The values s(start), ..., s(start-k+1)
+
+        Returns:
+            generator of tuple(int, int/Fraction/sympy expr): The index and value of every next term
+        """
+        degree = self._getDegree()
+        step = self._getStepFunction()
+        window = collections.deque(window, maxlen = degree)
+
+        s = self._sympy_context["s"]
+        n = self._sympy_context["n"]
+
+        i = start
+        while True:
+            i += 1
+
+            value = step(i, window) if step is not None else None
+            if value is None:
+                eq = self._recurrence
+                # replace all function calls to itself with calculated values
+                for j in range(1, degree + 1):
+                    eq = eq.subs(s(n - j), window[j - 1])
+
+                # replace n with the current iteration and simplify the result
+                value = eq.subs(n, i).simplify()
+                if value.is_Rational:
+                    value = self._toRational(value)
+
+            window.appendleft(value)
+
+            if self._memoize:
+                self._solvedValues[i] = value
+            if self._checkpointInterval and i % self._checkpointInterval == 0:
+                self._checkpoints[i] = tuple(window)
+            self._cursor = (i, tuple(window))
+
+            yield i, value
+
+    def iterValues(self, start, stop):
+        """
+        Lazily generate the values of the recurrence relation in the range [start, stop)
+        without solving it. Memory stays bounded by the degree of the recurrence unless
+        memoization or checkpoints are enabled.
+
+        Args:
+            start (int): The first value to generate
+            stop (int): The value to stop at, this value is not generated
+
+        Returns:
+            generator of int/Fraction/sympy expr: The exact values, rational values are native python numbers
+        """
+        if start < self.getLowerBoundDomain():
+            raise ValueError("The recurrence is not defined at n = %d" % start)
+
+        begin, window = self._nearestStart(start)
+
+        # Values that are covered by the initial conditions or the window itself
+        for i in range(start, min(begin + 1, stop)):
+            yield window[begin - i] if begin - i < len(window) else self._solvedValues[i]
+
+        if stop <= begin + 1:
+            return
+
+        for i, value in self._iterateFrom(begin, window):
+            if i >= start:
+                yield value
+            if i >= stop - 1:
+                return
+
+    def _calculateExactValueFromRecurrence(self, n):
+        """
+        Get the exact nth value from the recurrence relation without solving it
+
+        Args:
+            n (int): The nth value to calculate
+
+        Returns:
+            int/Fraction/sympy expr: The result, rational values are native python numbers
         """
 
         # Check if allready solved
         if n in self._solvedValues:
-            return self._solvedValues[n].evalf()
+            return self._solvedValues[n]
+        if n in self._checkpoints:
+            return self._checkpoints[n][0]
+        if self._cursor is not None and 0 <= self._cursor[0] - n < len(self._cursor[1]):
+            if self._cursor[1][self._cursor[0] - n] is not None:
+                return self._cursor[1][self._cursor[0] - n]
+
+        start, window = self._nearestStart(n)
+        if n < start:
+            raise ValueError("The recurrence is not defined at n = %d" % n)
+
+        # Jump directly to the value when it is far away and the recurrence can be evaluated
+        # by the companion matrix
+        companionMatrix = self._getCompanionMatrix()
+        if companionMatrix is not None and n - start > self._maxIterativeSteps:
+            if all(isinstance(v, (int, Fraction)) for v in window):
+                return companionMatrix.valueAt(n, start, window)
+
+        for i, value in self._iterateFrom(start, window):
+            if i == n:
+                return value
+
+    def calculateValueFromRecurrence(self, n, precision = 100):
+        """
+        Get the nth value from the recurrence relation without solving it
+
+        Args:
+            n (int): The nth value to calculate
+            precision (int): The amount of significant digits of the result
 
-        # Start solving from the next value that is not allready solved
-        startSolving = max(self._solvedValues) + 1
+        Returns:
+            float: The result
+        """
+        return sympy.sympify(self._calculateExactValueFromRecurrence(n)).evalf(precision)
 
-        for i in range(startSolving, n + 1):
-            eq = self._recurrence
-            # replace all function calls to itself with calculated values
-            for j in range(1, self._degree + 1):
-                replaceFunction = sympy.sympify("s(n-%d)" % j, self._sympy_context)
-                replaceWith = self._solvedValues[i - j]
-                eq = eq.subs(replaceFunction, replaceWith)
+    def calculateAdaptiveValueFromRecurrence(self, n, tolerance):
+        """
+        Get the nth value from the recurrence relation without solving it, as a float64 when
+        that is within the tolerance and in just enough digits to meet it otherwise
 
-            # replace n with the current iteration, simplify the result and store it
-            self._solvedValues[i] = eq.subs(self._sympy_context["n"], i).simplify()
+        Args:
+            n (int): The nth value to calculate
+            tolerance (float): The maximum absolute error of the result
 
-        return self._solvedValues[n].evalf(100)
+        Returns:
+            tuple(float/mpf, int): The result and the amount of significant digits used, 15 for float64
+        """
+        return self._approximate(self._calculateExactValueFromRecurrence(n), tolerance)
 
+    def calculateValuesFromRecurrence(self, values, backend = "numpy", precision = 100):
+        """
+        Get many values from the recurrence relation without solving it. The right hand side is
+        compiled once, so any recurrence, linear or not, is iterated at interpreter speed.
+
+        Args:
+            values (range or array of int): The values of n to calculate
+            backend (string): "numpy" to calculate in float64, "mpmath" to calculate with the
+                              given precision, "fraction" to calculate exactly
+            precision (int): The amount of decimal digits used by the mpmath backend
+
+        Returns:
+            numpy array: The results, of dtype float64 for numpy and of mpf objects for mpmath,
+                         the exact int/Fraction/sympy values for fraction
+        """
+        targets = [int(i) for i in values]
+        if backend not in ("numpy", "mpmath", "fraction"):
+            raise ValueError("Unknown backend \"%s\", expected numpy, mpmath or fraction" % backend)
+        if len(targets) == 0:
+            return numpy.array([], dtype = numpy.float64 if backend == "numpy" else object)
+
+        def convert(value):
+            if backend == "numpy":
+                return float(value)
+            elif backend == "mpmath":
+                if isinstance(value, Fraction):
+                    return mpmath.mpf(value.numerator) / value.denominator
+                return mpmath.mpf(value if isinstance(value, int) else sympy.sympify(value).evalf(precision))
+            return value
+
+        first, last = min(targets), max(targets)
+        start, window = self._nearestStart(first)
+        compiler = self._getStepCompiler()
+
+        with mpmath.workdps(precision):
+            # The exact values are used up to where the numeric iteration starts
+            results = {}
+            if backend == "fraction" or compiler is None or None in window:
+                stop = last + 1
+            else:
+                stop = min(start, last) + 1
+            for i, value in zip(range(first, stop), self.iterValues(first, stop)):
+                # Values between initial conditions that aren't consecutive aren't defined
+                if value is None:
+                    raise ValueError("The recurrence is not defined at n = %d" % i)
+                results[i] = convert(value)
+
+            if stop <= last:
+                function = compiler.getFunction(backend)
+                window = collections.deque([convert(v) for v in window], maxlen = self._getDegree())
+                for i in range(start + 1, last + 1):
+                    value = function(i, *window)
+                    window.appendleft(value)
+                    results[i] = value
+
+            return numpy.array([results[i] for i in targets], dtype = numpy.float64 if backend == "numpy" else object)
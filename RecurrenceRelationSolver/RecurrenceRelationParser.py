@@ -2,8 +2,10 @@
 # coding=utf-8
 import logging
 import re
+import sympy
 
-from . import RecurrenceRelation
+from .ExpressionParser import ExpressionParser, RecurrenceParseError
+from .RecurrenceRelation import RecurrenceRelation
 
 
 class RecurrenceRelationParser(object):
@@ -17,27 +19,39 @@ class RecurrenceRelationParser(object):
         """
         self._pattern = re.compile(r"s\((\d+|n)\)\s*=\s*?(.+)")
         self._logger = logging.getLogger(__name__)
+        self._expressionParser = ExpressionParser({
+            "s": sympy.Function("s"),
+            "n": sympy.Symbol("n", integer = True)
+        })
 
     def parse_recurrence(self, data):
         """
         parse and create a RecurrenceRelation object for it
 
         Args:
-            filename (string): The file to read
+            data (string): The contents of the file
 
         Returns:
             RecurrenceRelation: The parsed recurrence relation
+
+        Raises:
+            RecurrenceParseError: When an equation can't be parsed, with its position in the data,
+                                  or when there is no recurrence s(n) = ...
         """
         parsed = {}
-        for line in data.splitlines():
-            line = line.strip()
-
+        for lineNumber, line in enumerate(data.splitlines(), 1):
             m = re.search(self._pattern, line)
             if not m:
                 continue
 
             n = m.group(1)
-            eq = m.group(2).rstrip(",").strip()
+            eq = m.group(2).strip().rstrip(",").strip()
+            offset = m.start(2) + len(m.group(2)) - len(m.group(2).lstrip())
+            try:
+                expr = self._expressionParser.parse(eq)
+            except RecurrenceParseError as e:
+                raise RecurrenceParseError(e.reason, lineNumber, offset + e.column)
+
             if n in parsed:
                 msg = 'Multiple equation found with condition %s. in data %s' % (
                     n, data)
@@ -47,7 +61,10 @@ class RecurrenceRelationParser(object):
             if n.isdigit():
                 n = int(n)
 
-            parsed[n] = eq
+            parsed[n] = expr
+
+        if "n" not in parsed:
+            raise RecurrenceParseError("No recurrence s(n) = ... found", 1, 1)
 
         # remove the recurrence from the dictionary
         # and create a RecurrenceRelation object
@@ -1,13 +1,252 @@
 #!/usr/bin/env python3
 # coding=utf-8
 import argparse
+import contextlib
 import logging
-import glob
+import multiprocessing
+import multiprocessing.connection
 import os.path
 import os
 import errno
+import fnmatch
+import signal
+import sys
+import time
+import traceback
 
-from . import RecurrenceRelationParser
+from . import RecurrenceParseError, RecurrenceRelationParser, SolveCache, SolveStats
+
+
+def solveRelation(fn, data, check, tolerance, cache = None, profile = False, budget = None, pretty = False, engine = None,
+                  verify = "numeric"):
+    """
+    Parse, solve and verify a single recurrence relation
+
+    Args:
+        fn (string): The name of the file the relation was read from
+        data (string): The contents of the file
+        check (int): How many values to verify
+        tolerance (float): The maximum difference allowed between the recurrence and the closed form
+        cache (SolveCache): Persistent cache of closed forms, None to always solve
+        profile (bool): Record the time and memory spent in every stage of solving and verifying
+        budget (float): The amount of seconds after which simplification of the closed form is skipped
+        pretty (bool): Also simplify the closed form with sympy's generic simplify()
+        engine (string): The engine to solve with, "race" to race all engines, None for the default
+        verify (string): "numeric" to compare check values of the closed form with the recurrence, "proof"
+                         to prove the closed form symbolically and only compare values when that is inconclusive
+
+    Returns:
+        tuple(string, string, list of string, dict): The file name, the closed form or None if solving
+                                                     or verifying failed, the error messages and
+                                                     statistics about the solve, including the most
+                                                     significant digits verification needed and the
+                                                     seconds spent solving and verifying
+    """
+    stats = {}
+    profileStats = SolveStats() if profile else None
+    stage = profileStats.stage if profile else lambda name: contextlib.nullcontext()
+
+    # A relation that can't be parsed is reported like any other failure so the other relations are still solved
+    try:
+        with stage("parse"):
+            r = RecurrenceRelationParser().parse_recurrence(data)
+    except RecurrenceParseError as e:
+        return fn, None, [str(e)], stats
+
+    hits = cache.hits if cache is not None else 0
+    started = time.monotonic()
+    try:
+        solution = r.solve(cache, profileStats, budget, pretty = pretty, engine = engine)
+    except Exception:
+        solution = None
+        errors = [
+            "Exception occured while solving recurrence: %s" % r.getRecurrence(),
+            traceback.format_exc()
+        ]
+
+    stats["solveTime"] = time.monotonic() - started
+
+    if cache is not None:
+        stats["cache"] = "hit" if cache.hits > hits else "miss"
+    if solution is not None and r.getSolvingEngine() is not None:
+        stats["engine"] = r.getSolvingEngine()
+    if profile:
+        stats["profile"] = profileStats.stages
+
+    if solution is None:
+        return fn, None, errors, stats
+
+    # Verify the solved result
+    started = time.monotonic()
+    errors = []
+    proven = None
+    with stage("verify"):
+        if verify == "proof":
+            proven = r.proveClosedForm()
+            if proven is False:
+                errors = ["Verification of solved recurrence failed, the closed form doesn't satisfy the relation: %s" % r.getRecurrence()]
+                check = 0
+            elif proven:
+                check = 0
+            else:
+                check = check if check else 20
+
+        # Both sides are calculated with the least precision that keeps their errors well within the tolerance
+        start = r.getLowerBoundDomain()
+        for i in range(start, start + check):
+            iterative_result, iterative_digits = r.calculateAdaptiveValueFromRecurrence(i, tolerance / 4)
+            solved_result, solved_digits = r.calculateAdaptiveValueFromSolved(i, tolerance / 4)
+            stats["precision"] = max(stats.get("precision", 0), iterative_digits, solved_digits)
+            if abs(iterative_result - solved_result) >= tolerance:
+                errors = [
+                    "Verification of solved recurrence failed at n = %d for relation: %s" % (i, r.getRecurrence()),
+                    "Recurrence says: %s" % str(iterative_result),
+                    "Solved says: %s" % str(solved_result),
+                    "Delta: %s" % str(abs(iterative_result - solved_result))
+                ]
+                break
+    stats["verifyTime"] = time.monotonic() - started
+
+    if errors:
+        return fn, None, errors, stats
+
+    # Only the method that actually verified the closed form is recorded
+    if proven:
+        stats["verification"] = "proof"
+    elif check:
+        stats["verification"] = "numeric"
+
+    return fn, solution, [], stats
+
+def _exitWorker(signum, frame):
+    """
+    Signal handler of a worker process that exits through the normal exit path of multiprocessing,
+    which also terminates the processes the worker started to simplify or race engines
+    """
+    sys.exit(1)
+
+def _solveRelationWorker(connection, task):
+    """
+    Entry point of a worker process, solves a single relation and sends back the result
+
+    Args:
+        connection (multiprocessing.Connection): Where to send the result of solveRelation
+        task (tuple): The arguments for solveRelation
+    """
+    signal.signal(signal.SIGTERM, _exitWorker)
+    try:
+        result = solveRelation(*task)
+    except Exception:
+        result = (task[0], None, ["Exception occured while processing %s" % task[0], traceback.format_exc()], {})
+
+    connection.send(result)
+    connection.close()
+
+def solveRelationsParallel(tasks, jobs, timeout = None):
+    """
+    Solve relations in separate worker processes. Every relation gets its own process
+    so a crash or a hang only affects that relation. The workers aren't daemonic because
+    solving can start processes of its own, they are terminated explicitly instead.
+
+    Args:
+        tasks (iterable of tuple): The arguments for solveRelation of every relation
+        jobs (int): The maximum amount of relations solved at the same time
+        timeout (float): The amount of seconds after which a relation is given up, None for no limit
+
+    Returns:
+        generator of tuple: The results of solveRelation in completion order
+    """
+    tasks = iter(tasks)
+    running = {}
+    exhausted = False
+
+    try:
+        while True:
+            # Keep all workers busy
+            while not exhausted and len(running) < jobs:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+
+                receiver, sender = multiprocessing.Pipe(duplex = False)
+                process = multiprocessing.Process(target = _solveRelationWorker, args = (sender, task))
+                process.start()
+                sender.close()
+
+                deadline = time.monotonic() + timeout if timeout else None
+                running[receiver] = (process, task[0], deadline)
+
+            if len(running) == 0:
+                return
+
+            deadlines = [d for _, _, d in running.values() if d is not None]
+            wait = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            for receiver in multiprocessing.connection.wait(list(running), wait):
+                process, fn, _ = running.pop(receiver)
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    process.join()
+                    result = (fn, None, ["Worker solving %s died with exit code %s" % (fn, str(process.exitcode))], {})
+
+                receiver.close()
+                process.join()
+                yield result
+
+            now = time.monotonic()
+            for receiver, (process, fn, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    yield fn, None, ["Solving %s took longer than %s seconds" % (fn, str(timeout))], {}
+    finally:
+        # Workers that are still running when the results aren't consumed anymore are stopped
+        for receiver, (process, _, _) in running.items():
+            process.terminate()
+            process.join()
+            receiver.close()
+
+
+def discoverFiles(directory, patterns, exclude = None):
+    """
+    Lazily find the files under a directory, and all its subdirectories, that match a pattern.
+    Directories are walked with os.scandir one at a time so files are found as soon as their
+    directory is read, in sorted order per directory.
+
+    Args:
+        directory (string): The directory to search
+        patterns (list of string): Glob patterns that are matched against the file name and
+                                   against the path relative to the directory
+        exclude (string): Skip files whose name ends with this suffix, None to skip nothing
+
+    Returns:
+        generator of tuple(string, string): The path and the path relative to the directory of every file
+    """
+    pending = [""]
+    while pending:
+        relativeDirectory = pending.pop()
+        try:
+            with os.scandir(os.path.join(directory, relativeDirectory)) as it:
+                entries = sorted(it, key = lambda e: e.name)
+        except OSError as e:
+            logging.warning("Can't read directory %s: %s" % (os.path.join(directory, relativeDirectory), str(e)))
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative = os.path.join(relativeDirectory, entry.name)
+            if entry.is_dir(follow_symlinks = False):
+                subdirectories.append(relative)
+            elif entry.is_file() and not (exclude and entry.name.endswith(exclude)):
+                if any(fnmatch.fnmatch(entry.name, p) or fnmatch.fnmatch(relative, p) for p in patterns):
+                    yield entry.path, relative
+
+        # Depth first in sorted order
+        pending.extend(reversed(subdirectories))
 
 
 def main():
@@ -21,6 +260,12 @@ def main():
     argParser.add_argument('-i', '--inputdir', type=str,
                            dest='inputdir', required=True,
                            help='Input directory where files with recurrence relations are placed.')
+    argParser.add_argument('--pattern', type=str, action='append',
+                           dest='patterns', required=False,
+                           help='Glob pattern of the files with recurrence relations, matched against the file name and ' +
+                                'the path relative to the input directory. All subdirectories are searched. Can be given ' +
+                                'multiple times. Solutions (-dir.txt) are skipped when the output directory is the input ' +
+                                'directory. Defaults to comass[0-9][0-9].txt')
     argParser.add_argument('-o', '--outputdir', type=str,
                            dest='outputdir', required=False,
                            help='Output directory where results are saved. Defaults to input directory')
@@ -32,18 +277,55 @@ def main():
     argParser.add_argument('-p', '--precision', type=int,
                            dest='precision', required=False,
                            help='The amount of places after the decimal point that have to be equal between a test ' +
-                                'of the solved equation vs the recurrence relation to be considered correct. Defaults to 4')
+                                'of the solved equation vs the recurrence relation to be considered correct. Values are ' +
+                                'calculated in float64 when that is precise enough and with just enough digits otherwise. ' +
+                                'Defaults to 4')
+    argParser.add_argument('-j', '--jobs', type=int,
+                           dest='jobs', required=False,
+                           help='How many relations to solve at the same time in separate processes. Defaults to 1')
+    argParser.add_argument('-t', '--timeout', type=float,
+                           dest='timeout', required=False,
+                           help='Give up solving and verifying a relation after this many seconds. Defaults to no limit')
+    argParser.add_argument('--cache', type=str,
+                           dest='cache', required=False,
+                           help='File in which solved closed forms are cached between runs. Defaults to no cache')
+    argParser.add_argument('--cache-size', type=int,
+                           dest='cacheSize', required=False,
+                           help='The maximum amount of bytes of closed forms kept in the cache. Defaults to 64 MiB')
+    argParser.add_argument('-b', '--budget', type=float,
+                           dest='budget', required=False,
+                           help='Skip simplifying the closed form when solving takes longer than this many seconds. ' +
+                                'The closed form is still correct. Defaults to no limit')
+    argParser.add_argument('--pretty', action='store_true',
+                           dest='pretty', help='Also simplify the closed forms with the generic sympy simplify. ' +
+                                               'This gives nicer results but is much slower.')
+    argParser.add_argument('-e', '--engine', type=str, choices=['characteristic', 'generatingFunction', 'race'],
+                           dest='engine', required=False,
+                           help='The engine to solve with. race solves with all engines in parallel processes and keeps ' +
+                                'the first verified result, the wins are remembered in the cache. Defaults to the engine ' +
+                                'that won most races for relations of the same shape')
+    argParser.add_argument('--verify', type=str, choices=['numeric', 'proof'],
+                           dest='verify', required=False,
+                           help='numeric compares the values of --check indices of the closed form with the recurrence. ' +
+                                'proof substitutes the closed form into the recurrence and checks the initial conditions ' +
+                                'exactly, it only compares values, --check or 20 of them, when that is inconclusive. ' +
+                                'Defaults to numeric')
+    argParser.add_argument('--profile', action='store_true',
+                           dest='profile', help='Print the time and memory spent in every stage of solving per relation ' +
+                                                'and an aggregate JSON report at the end.')
 
     args = argParser.parse_args()
     args.outputdir = args.outputdir if args.outputdir else args.inputdir
     args.check = args.check if args.check else 0
     args.precision = args.precision if args.precision else 4
+    args.jobs = args.jobs if args.jobs else 1
+    args.verify = args.verify if args.verify else "numeric"
+    args.patterns = args.patterns if args.patterns else ["comass[0-9][0-9].txt"]
+    args.cacheSize = args.cacheSize if args.cacheSize else 64 * 1024 * 1024
 
     loglevel = logging.WARNING if args.quiet else logging.INFO
     logging.basicConfig(format='%(message)s', level=loglevel)
 
-    recurrenceParser = RecurrenceRelationParser()
-
     # Create output directory if it doesn't exist
     try:
         os.makedirs(args.outputdir)
@@ -51,43 +333,83 @@ def main():
         if exception.errno != errno.EEXIST:
             raise
 
-    # Read in the relations from the input directory
-    relations = {}
-    for path in glob.glob(os.path.join(args.inputdir, "comass[0-9][0-9].txt")):
-        _, fn = os.path.split(path)
-        with open(path, "r") as f:
-            relations[fn] = recurrenceParser.parse_recurrence(f.read())
-
     tolerance = 10**(-args.precision)
-    for fn, r in relations.items(): 
-        print("Solving %s" % fn)
-        try:
-            r.solve()
-        except Exception as e:
-            logging.error("Exception occured while solving recurrence: %s" % r.getRecurrence())
-            logging.error(e, exc_info = True)
-            continue
+    cache = SolveCache(args.cache, args.cacheSize) if args.cache else None
 
-        # Verify the solved result 
-        failed = False
-        start = r.getLowerBoundDomain()
-        for i in range(start, start + args.check):
-            iterative_result = r.calculateValueFromRecurrence(i)
-            solved_result = r.calculateValueFromSolved(i)
-            if abs(iterative_result - solved_result) >= tolerance:
-                failed = True
-                logging.error("Verification of solved recurrence failed at n = %d for relation: %s" % (i, r.getRecurrence()))
-                logging.error("Recurrence says: %s" % str(iterative_result))
-                logging.error("Solved says: %s" % str(solved_result))
-                logging.error("Delta: %s" % str(abs(iterative_result - solved_result)))
-                break
-        
-        if failed:
+    # Read the relations one at a time while they are discovered, so solving starts with the first file and
+    # memory doesn't grow with the amount of files. Solutions are written next to where the relation is in
+    # the output directory, when that is the input directory the solutions of an earlier run are skipped
+    exclude = "-dir.txt" if os.path.abspath(args.outputdir) == os.path.abspath(args.inputdir) else None
+
+    def readTasks():
+        for path, fn in discoverFiles(args.inputdir, args.patterns, exclude = exclude):
+            try:
+                with open(path, "r") as f:
+                    data = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                logging.error("Can't read %s: %s" % (path, str(e)))
+                continue
+
+            print("Solving %s" % fn)
+            yield (fn, data, args.check, tolerance, cache, args.profile, args.budget, args.pretty, args.engine, args.verify)
+
+    # A timeout can only be enforced by running the relation in a separate process
+    if args.jobs > 1 or args.timeout:
+        results = solveRelationsParallel(readTasks(), args.jobs, args.timeout)
+    else:
+        results = (solveRelation(*task) for task in readTasks())
+
+    cacheCounts = { "hit": 0, "miss": 0 }
+    engineCounts = {}
+    precision = 0
+    times = { "solveTime": 0.0, "verifyTime": 0.0 }
+    verificationCounts = {}
+    profileStats = SolveStats()
+    for fn, solution, errors, stats in results:
+        for e in errors:
+            logging.error(e)
+
+        if "cache" in stats:
+            cacheCounts[stats["cache"]] += 1
+        if "engine" in stats:
+            engineCounts[stats["engine"]] = engineCounts.get(stats["engine"], 0) + 1
+        if "precision" in stats:
+            precision = max(precision, stats["precision"])
+        for key in times:
+            times[key] += stats.get(key, 0.0)
+        if "verification" in stats:
+            verificationCounts[stats["verification"]] = verificationCounts.get(stats["verification"], 0) + 1
+
+        if "profile" in stats:
+            relationStats = SolveStats()
+            relationStats.merge(stats["profile"])
+            profileStats.merge(stats["profile"])
+            print("Profile of %s:\n%s" % (fn, relationStats.formatTable()))
+
+        if solution is None:
             continue
 
-        path = os.path.join(args.outputdir, fn.replace(".txt", "-dir.txt"))
+        path = os.path.join(args.outputdir, os.path.splitext(fn)[0] + "-dir.txt")
+        os.makedirs(os.path.dirname(path), exist_ok = True)
         with open(path, "w+") as f:
-            f.write("sdir := n -> %s;\n" % r.solve())
+            f.write("sdir := n -> %s;\n" % solution)
+
+    if cache is not None:
+        cache.close()
+        print("Solve cache: %d hits, %d misses" % (cacheCounts["hit"], cacheCounts["miss"]))
+
+    if engineCounts:
+        print("Solved by: %s" % ", ".join("%s %d" % (e, c) for e, c in sorted(engineCounts.items())))
+
+    if precision:
+        print("Verified with at most %d significant digits" % precision)
+
+    print("Solving took %.3f seconds, verifying took %.3f seconds" % (times["solveTime"], times["verifyTime"]))
+    if verificationCounts:
+        print("Verified by: %s" % ", ".join("%s %d" % (v, c) for v, c in sorted(verificationCounts.items())))
+
+    if args.profile:
+        print(profileStats.toJson())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import collections
+import threading
+import mpmath
+import sympy
+
+
+class RootFinder(object):
+    """
+    RootFinder object that finds the real roots of characteristic equations with their
+    multiplicities. The polynomial is factored over the rationals first. Factors up to
+    degree 4 are solved in radicals. Higher degree factors, and factors whose real roots
+    only have a radical form with complex intermediate values, are represented exactly
+    with CRootOf. Polynomials with irrational coefficients that have no radical solution
+    fall back to high precision numeric roots. The results are memoized per coefficient
+    tuple with LRU eviction because many relations share characteristic equations.
+    """
+
+    def __init__(self, size = 256, precision = 50):
+        """
+        create RootFinder object
+
+        Args:
+            size (int): The maximum amount of characteristic equations to remember
+            precision (int): The amount of significant digits of numeric roots
+        """
+        self._size = size
+        self._precision = precision
+        self._roots = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        Forget all roots
+        """
+        with self._lock:
+            self._roots.clear()
+
+    def _factorRoots(self, factor):
+        """
+        Find the real roots of an irreducible factor
+
+        Args:
+            factor (sympy Poly): The factor
+
+        Returns:
+            list of sympy expr: The real roots
+        """
+        if factor.degree() <= 4:
+            roots = sympy.roots(factor, multiple = True)
+            imaginary = [r for r in roots if sympy.I in r.atoms()]
+
+            # the radical form of real roots of cubics and quartics can contain I
+            if len(roots) == factor.degree() and (factor.degree() <= 2 or not imaginary):
+                return [r for r in roots if r not in imaginary]
+
+        return [r for r in factor.all_roots() if r.is_real]
+
+    def _numericRoots(self, poly):
+        """
+        Find the real roots of a polynomial numerically, roots that are equal
+        up to the precision are combined into a single root with a multiplicity
+
+        Args:
+            poly (sympy Poly): The polynomial
+
+        Returns:
+            dict of sympy Float: int: The real roots with their multiplicities
+        """
+        roots = {}
+        with mpmath.workdps(2 * self._precision):
+            coefficients = [mpmath.mpmathify(c.evalf(2 * self._precision)) for c in poly.all_coeffs()]
+            found = mpmath.polyroots(coefficients, maxsteps = 200, extraprec = 4 * self._precision)
+            tolerance = mpmath.mpf(10)**(-self._precision // 2)
+
+            clusters = []
+            for r in found:
+                for cluster in clusters:
+                    if abs(cluster[0] - r) < tolerance * max(1, abs(r)):
+                        cluster.append(r)
+                        break
+                else:
+                    clusters.append([r])
+
+            for cluster in clusters:
+                root = sum(cluster) / len(cluster)
+                if abs(mpmath.im(root)) < tolerance:
+                    roots[sympy.Float(mpmath.re(root), self._precision)] = len(cluster)
+
+        return roots
+
+    def _findRealRoots(self, coefficients):
+        """
+        Find the real roots of the characteristic equation r^k - c_1 * r^(k-1) - ... - c_k
+
+        Args:
+            coefficients (tuple of sympy expr): The coefficient of s(n-i) at position i - 1
+
+        Returns:
+            dict of sympy expr: int: The real roots with their multiplicities
+        """
+        r = sympy.Symbol('r')
+        poly = sympy.Poly([1] + [-c for c in coefficients], r)
+
+        if not poly.domain.is_QQ and not poly.domain.is_ZZ:
+            roots = sympy.roots(poly)
+            if sum(roots.values()) == poly.degree():
+                return { root: m for root, m in roots.items() if sympy.I not in root.atoms() }
+
+            return self._numericRoots(poly)
+
+        roots = {}
+        for factor, multiplicity in poly.factor_list()[1]:
+            for root in self._factorRoots(factor):
+                roots[root] = roots.get(root, 0) + multiplicity
+
+        return roots
+
+    def getRealRoots(self, coefficients):
+        """
+        Get the real roots of the characteristic equation of a recurrence
+
+        Args:
+            coefficients (tuple of sympy expr): The coefficient of s(n-i) at position i - 1
+
+        Returns:
+            dict of sympy expr: int: The real roots with their multiplicities
+        """
+        key = tuple(coefficients)
+        with self._lock:
+            if key in self._roots:
+                self.hits += 1
+                self._roots.move_to_end(key)
+                return dict(self._roots[key])
+            self.misses += 1
+
+        roots = self._findRealRoots(key)
+
+        with self._lock:
+            self._roots[key] = roots
+            self._roots.move_to_end(key)
+            while len(self._roots) > self._size:
+                self._roots.popitem(last = False)
+
+        return dict(roots)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import os
+import sqlite3
+
+
+class SolveCache(object):
+    """
+    SolveCache object that persistently stores solved closed forms in an SQLite database
+    so relations that have been solved before don't have to be solved again. When the
+    stored closed forms exceed the maximum size the least recently used ones are evicted.
+    It also keeps track of which solve engine won the races per shape of relation.
+    """
+
+    def __init__(self, path, maxSize = 64 * 1024 * 1024):
+        """
+        create SolveCache object
+
+        Args:
+            path (string): The file the cache is stored in
+            maxSize (int): The maximum amount of bytes of closed forms to keep
+        """
+        self._path = path
+        self._maxSize = maxSize
+
+        self.hits = 0
+        self.misses = 0
+
+        # The connection is opened lazily and per process, sqlite connections can't be
+        # shared with worker processes
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
+
+    def _getConnection(self):
+        """
+        Get the connection to the database, creating the database if needed
+
+        Returns:
+            sqlite3.Connection: The connection
+        """
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok = True)
+
+            self._connection = sqlite3.connect(self._path, timeout = 60)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS closed_forms ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS engine_wins ("
+                "shape TEXT NOT NULL, engine TEXT NOT NULL, wins INTEGER NOT NULL, PRIMARY KEY (shape, engine))")
+            self._connection.commit()
+            self._pid = os.getpid()
+
+        return self._connection
+
+    def get(self, key):
+        """
+        Get a closed form from the cache
+
+        Args:
+            key (string): The key of the relation
+
+        Returns:
+            string: The serialized closed form, None if it isn't cached
+        """
+        connection = self._getConnection()
+        row = connection.execute("SELECT value FROM closed_forms WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        connection.execute("UPDATE closed_forms SET accessed = (SELECT MAX(accessed) + 1 FROM closed_forms) WHERE key = ?", (key,))
+        connection.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, value):
+        """
+        Store a closed form in the cache and evict the least recently used closed forms
+        when the cache grew too large
+
+        Args:
+            key (string): The key of the relation
+            value (string): The serialized closed form
+        """
+        connection = self._getConnection()
+        # Recency is a sequence number instead of a time, so two accesses within the resolution of the clock
+        # still have an order
+        connection.execute("INSERT OR REPLACE INTO closed_forms (key, value, size, accessed) "
+                           "VALUES (?, ?, ?, (SELECT COALESCE(MAX(accessed), 0) + 1 FROM closed_forms))",
+                           (key, value, len(value.encode("utf-8"))))
+
+        size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM closed_forms").fetchone()[0]
+        if size > self._maxSize:
+            evict = []
+            for oldKey, oldSize in connection.execute("SELECT key, size FROM closed_forms ORDER BY accessed"):
+                if size <= self._maxSize:
+                    break
+                evict.append((oldKey,))
+                size -= oldSize
+
+            connection.executemany("DELETE FROM closed_forms WHERE key = ?", evict)
+
+        connection.commit()
+
+    def recordWin(self, shape, engine):
+        """
+        Record that an engine won a race
+
+        Args:
+            shape (string): The shape of the relation
+            engine (string): The name of the engine
+        """
+        connection = self._getConnection()
+        connection.execute("INSERT OR IGNORE INTO engine_wins (shape, engine, wins) VALUES (?, ?, 0)", (shape, engine))
+        connection.execute("UPDATE engine_wins SET wins = wins + 1 WHERE shape = ? AND engine = ?", (shape, engine))
+        connection.commit()
+
+    def getWins(self, shape):
+        """
+        Get how often every engine won a race for a shape of relation
+
+        Args:
+            shape (string): The shape of the relation
+
+        Returns:
+            dict of string: int: The wins per engine
+        """
+        connection = self._getConnection()
+        return dict(connection.execute("SELECT engine, wins FROM engine_wins WHERE shape = ?", (shape,)).fetchall())
+
+    def close(self):
+        """
+        Close the connection to the database
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+
+        self._connection = None
+        self._pid = None
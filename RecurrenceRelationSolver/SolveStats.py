@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import collections
+import contextlib
+import json
+import time
+import tracemalloc
+
+
+class SolveStats(object):
+    """
+    SolveStats object that records the wall time, the amount of calls and the peak
+    memory use of every stage of solving recurrence relations. Stages can be nested,
+    the time and memory of a nested stage are also counted for the enclosing stage.
+    """
+
+    def __init__(self):
+        """
+        create SolveStats object
+        """
+        # Contains per stage name a dict with the total time in seconds, the amount
+        # of calls and the peak memory in bytes allocated during a single call
+        self.stages = collections.OrderedDict()
+
+        # The stages that are currently running as [start time, traced memory at the start, peak memory]
+        self._running = []
+        self._startedTracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Record a stage for the duration of a with block
+
+        Args:
+            name (string): The name of the stage
+        """
+        if len(self._running) == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._startedTracing = True
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        # resetting the peak hides the peak the enclosing stage has reached so far, keep it there
+        if len(self._running) > 0:
+            self._running[-1][2] = max(self._running[-1][2], peak)
+        tracemalloc.reset_peak()
+        self._running.append([time.perf_counter(), current, current])
+
+        try:
+            yield
+        finally:
+            start, startMemory, peak = self._running.pop()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+
+            # resetting the peak hides it from the enclosing stage so pass it on
+            if len(self._running) > 0:
+                self._running[-1][2] = max(self._running[-1][2], peak)
+
+            self.add(name, time.perf_counter() - start, 1, peak - startMemory)
+
+            if len(self._running) == 0 and self._startedTracing:
+                tracemalloc.stop()
+                self._startedTracing = False
+
+    def add(self, name, seconds, calls, peakMemory):
+        """
+        Add measurements to a stage
+
+        Args:
+            name (string): The name of the stage
+            seconds (float): The wall time spent in the stage
+            calls (int): How often the stage was run
+            peakMemory (int): The peak amount of bytes allocated during a single run
+        """
+        stage = self.stages.setdefault(name, { "time": 0.0, "calls": 0, "peakMemory": 0 })
+        stage["time"] += seconds
+        stage["calls"] += calls
+        stage["peakMemory"] = max(stage["peakMemory"], peakMemory)
+
+    def merge(self, stages):
+        """
+        Add all the stages recorded by another stats object
+
+        Args:
+            stages (dict of string: dict): The stages of the other stats object
+        """
+        for name, stage in stages.items():
+            self.add(name, stage["time"], stage["calls"], stage["peakMemory"])
+
+    def formatTable(self):
+        """
+        Format the stages as a human readable table
+
+        Returns:
+            string: The table
+        """
+        lines = ["%-24s %10s %6s %12s" % ("stage", "time (s)", "calls", "peak (KiB)")]
+        for name, stage in self.stages.items():
+            lines.append("%-24s %10.4f %6d %12.1f" % (name, stage["time"], stage["calls"], stage["peakMemory"] / 1024.0))
+
+        return "\n".join(lines)
+
+    def toJson(self):
+        """
+        Format the stages as JSON
+
+        Returns:
+            string: The JSON report
+        """
+        return json.dumps(self.stages, indent = 2)
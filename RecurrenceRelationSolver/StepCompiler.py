@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+from fractions import Fraction
+from sympy.printing.pycode import PythonCodePrinter
+
+
+class FractionPrinter(PythonCodePrinter):
+    """
+    FractionPrinter object that prints rational constants and negative integer powers as
+    Fraction arithmetic, so integer and Fraction arguments give exact results
+    """
+
+    def _print_Rational(self, expr):
+        return "Fraction(%d, %d)" % (expr.p, expr.q)
+
+    def _print_Half(self, expr):
+        return self._print_Rational(expr)
+
+    def _print_Pow(self, expr, rational = False):
+        if expr.exp.is_Integer and expr.exp < 0:
+            return "Fraction(%s)**(%d)" % (self._print(expr.base), expr.exp)
+        return super(FractionPrinter, self)._print_Pow(expr, rational = rational)
+
+
+class StepCompiler(object):
+    """
+    StepCompiler object that compiles the right hand side of a recurrence, linear or not,
+    once into a python callable of (n, s(n-1), ..., s(n-k)). Iterating with the callable runs
+    at interpreter speed instead of substituting into the sympy expression at every step.
+    The "numpy" backend calculates in float64, the "mpmath" backend in mpf at the working
+    precision of mpmath and the "fraction" backend exactly with int and Fraction.
+    """
+
+    def __init__(self, recurrence, s, n, degree):
+        """
+        create StepCompiler object
+
+        Args:
+            recurrence (sympy expression): The right hand side of the recurrence
+            s (sympy Function): The function of the recurrence
+            n (sympy Symbol): The variable of the recurrence
+            degree (int): The degree of the recurrence
+        """
+        self._n = n
+        self._previous = [sympy.Symbol("s%d" % i) for i in range(1, degree + 1)]
+        self._expression = recurrence.xreplace({ s(n - i): p for i, p in enumerate(self._previous, 1) })
+        self._functions = {}
+
+    def isSupported(self):
+        """
+        Check whether the recurrence only depends on n and s(n-1), ..., s(n-k)
+
+        Returns:
+            bool: True if it can be compiled
+        """
+        return self._expression.free_symbols <= set([self._n] + self._previous) and \
+            not any(isinstance(f, sympy.core.function.AppliedUndef) for f in self._expression.atoms(sympy.Function))
+
+    def getFunction(self, backend):
+        """
+        Get the compiled right hand side for a backend
+
+        Args:
+            backend (string): "numpy", "mpmath" or "fraction"
+
+        Returns:
+            function(int, values...): Calculates s(n) given n, s(n-1), ..., s(n-k)
+        """
+        if backend not in self._functions:
+            args = [self._n] + self._previous
+            if backend == "numpy":
+                function = sympy.lambdify(args, self._expression, modules = "math")
+            elif backend == "mpmath":
+                function = sympy.lambdify(args, self._expression, modules = "mpmath")
+            elif backend == "fraction":
+                function = sympy.lambdify(args, self._expression, modules = [{ "Fraction": Fraction }, "math"],
+                                          printer = FractionPrinter({ "fully_qualified_modules": False, "inline": True,
+                                                                      "allow_unknown_functions": True }))
+            else:
+                raise ValueError("Unknown backend \"%s\", expected numpy, mpmath or fraction" % backend)
+            self._functions[backend] = function
+
+        return self._functions[backend]
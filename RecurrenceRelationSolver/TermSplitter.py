@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sympy
+
+
+class TermSplitter(object):
+    """
+    TermSplitter object that splits a single term into the form constant * n^degree * base^n.
+    Every closed form and every supported non homogeneous part is a sum of such terms, so
+    this is shared by everything that works on them term by term.
+    """
+
+    def __init__(self, n):
+        """
+        create TermSplitter object
+
+        Args:
+            n (sympy symbol): The variable of the terms
+        """
+        self._n = n
+
+    def split(self, term):
+        """
+        Split a single term into the form constant * n^degree * base^n
+
+        Args:
+            term (sympy expression): The term to split
+
+        Returns:
+            tuple(sympy expr, int, sympy expr): The base, degree and constant of the term,
+                                                or None if the term is not of that form
+        """
+        n = self._n
+
+        base = sympy.Integer(1)
+        degree = 0
+        constant = sympy.Integer(1)
+        for a in sympy.Mul.make_args(term):
+            if not a.has(n):
+                constant *= a
+            elif a == n:
+                degree += 1
+            elif a.is_Pow and a.base == n and a.exp.is_Integer and a.exp > 0:
+                degree += int(a.exp)
+            elif a.is_Pow and not a.base.has(n):
+                # base^(c*n + d) = (base^c)^n * base^d
+                slope = a.exp.diff(n)
+                if slope.has(n):
+                    return None
+                base *= a.base**slope
+                constant *= a.base**a.exp.subs(n, 0)
+            else:
+                return None
+
+        return base, degree, constant
@@ -1,2 +1,5 @@
+from .ExpressionParser import RecurrenceParseError
 from .RecurrenceRelation import RecurrenceRelation
 from .RecurrenceRelationParser import RecurrenceRelationParser
+from .SolveCache import SolveCache
+from .SolveStats import SolveStats
\ No newline at end of file
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import sympy
+
+from RecurrenceRelationSolver import RecurrenceRelation, RecurrenceRelationParser
+
+
+# Relations from the test suite, as (recurrence, initial conditions)
+CORPUS = {
+    "comass03": ("-4*s(n-2) + 4*s(n-1)", {0: "6", 1: "8"}),
+    "comass07": ("s(n-1)+s(n-2)", {0: "1", 1: "1"}),
+    "comass16": ("8*s(n-2)-16*s(n-4) +n^3", {0: "0", 1: "1", 2: "2", 3: "3"}),
+    "comass33": ("(9/2)*s(n-2) +(3/2)*s(n-3)-5*s(n-4)-3*s(n-5) + (n-5)^2-3*(n-5)+7",
+                 {0: "2", 1: "4", 2: "8", 3: "1", 4: "3"}),
+    "comass36": ("-2*s(n-1)+11*s(n-2)+12*s(n-3)-36*s(n-4) +41^(n-4)+3", {0: "1", 1: "1", 2: "1", 3: "1"}),
+    "week7_exercise5a": ("8*s(n-2) - 16*s(n-4) + (-2)^n", {0: "0", 1: "1", 2: "2", 3: "3"}),
+    "week7_exercise5b": ("8*s(n-2) - 16*s(n-4) + n^2*4*n", {0: "0", 1: "1", 2: "2", 3: "3"}),
+    "week7_exercise5c": ("8*s(n-2) - 16*s(n-4) + n^4 * 2^n", {0: "0", 1: "1", 2: "2", 3: "3"}),
+    "week7_exercise6": ("-5*s(n-1) - 6*s(n-2) + 42 * 4^n", {0: "56", 1: "278"}),
+    "week7_exercise7": ("4*s(n-1) - 3*s(n-2) + 2^n + n + 3", {0: "1", 1: "4"}),
+}
+
+
+def syntheticRelation(degree, nonHomogeneous = None):
+    """
+    Build a recurrence of a given degree whose characteristic equation has the roots 1, -2, 3, ...
+
+    Args:
+        degree (int): The degree of the recurrence
+        nonHomogeneous (string): The non homogeneous part to add, None for a homogeneous recurrence
+
+    Returns:
+        tuple(string, dict of int: string): The recurrence and its initial conditions
+    """
+    r = sympy.Symbol("r")
+    characteristic = sympy.Poly(sympy.prod([r - (i if i % 2 else -i) for i in range(1, degree + 1)]), r)
+    coefficients = characteristic.all_coeffs()
+
+    terms = ["(%s)*s(n-%d)" % (str(-c), i) for i, c in enumerate(coefficients[1:], 1) if c != 0]
+    if nonHomogeneous is not None:
+        terms.append(nonHomogeneous)
+
+    return " + ".join(terms), { i: str(i + 1) for i in range(0, degree) }
+
+
+def synthetic():
+    """
+    Get scaled up synthetic relations
+
+    Returns:
+        dict of string: tuple(string, dict of int: string): The relations by name
+    """
+    relations = {}
+    for degree in [6, 8, 20]:
+        relations["synthetic_degree%d" % degree] = syntheticRelation(degree)
+        relations["synthetic_degree%d_nonhomogeneous" % degree] = syntheticRelation(degree, "n^2 * 5^n + 7")
+
+    return relations
+
+
+def measure(function, repeat):
+    """
+    Measure the fastest of several runs of a function
+
+    Args:
+        function (function): The function to measure, it is called without arguments
+        repeat (int): How often to run the function
+
+    Returns:
+        float: The fastest wall time in seconds
+    """
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def benchmarkRelation(recurrence, initialConditions, repeat, count):
+    """
+    Benchmark solving and evaluating a single relation
+
+    Args:
+        recurrence (string): The recurrence
+        initialConditions (dict of int: string): The initial conditions
+        repeat (int): How often every stage is run, the fastest run is reported
+        count (int): How many values are evaluated per evaluation stage and relations are parsed per parse stage
+
+    Returns:
+        dict of string: float: The wall time in seconds per stage
+    """
+    results = {}
+
+    # Parsing is cheap compared to solving, so a batch of relations is parsed per run
+    text = "eqs :=\n[\ns(n) = %s,\n%s\n];" % (recurrence, ",\n".join(
+        "s(%d) = %s" % (i, v) for i, v in sorted(initialConditions.items())))
+    parser = RecurrenceRelationParser()
+    results["parse"] = measure(lambda: [parser.parse_recurrence(text) for _ in range(0, count)], repeat)
+
+    # The roots of the characteristic equation are shared between relations, forget them so every run solves from scratch
+    def solve():
+        RecurrenceRelation._rootFinder.clear()
+        RecurrenceRelation(recurrence, initialConditions).solve()
+
+    results["solve"] = measure(solve, repeat)
+
+    # Every run evaluates on a fresh relation so nothing is reused from an earlier run
+    start = min(initialConditions)
+
+    def recurrenceValues():
+        relation = RecurrenceRelation(recurrence, initialConditions)
+        for i in range(start, start + count):
+            relation.calculateValueFromRecurrence(i)
+
+    results["calculateValueFromRecurrence"] = measure(recurrenceValues, repeat)
+
+    solved = RecurrenceRelation(recurrence, initialConditions)
+    solved.solve()
+    results["calculateValueFromSolved"] = measure(
+        lambda: [solved.calculateValueFromSolved(i) for i in range(start, start + count)], repeat)
+
+    return results
+
+
+def runBenchmarks(names, repeat, count):
+    """
+    Run the benchmarks
+
+    Args:
+        names (list of string): Only run the relations with these names, None for all
+        repeat (int): How often every stage is run, the fastest run is reported
+        count (int): How many values are evaluated per evaluation stage
+
+    Returns:
+        dict of string: dict of string: float: The wall time in seconds per relation per stage
+    """
+    relations = dict(CORPUS)
+    relations.update(synthetic())
+
+    results = {}
+    for name, (recurrence, initialConditions) in sorted(relations.items()):
+        if names and name not in names:
+            continue
+
+        results[name] = benchmarkRelation(recurrence, initialConditions, repeat, count)
+        print("%-40s %s" % (name, "  ".join("%s: %.4fs" % (k, v) for k, v in results[name].items())))
+
+    return results
+
+
+def compare(results, baseline, threshold, minimum):
+    """
+    Compare the results of the benchmarks to a baseline
+
+    Args:
+        results (dict of string: dict of string: float): The wall time per relation per stage
+        baseline (dict of string: dict of string: float): The wall time per relation per stage of the baseline
+        threshold (float): The fraction a stage may be slower than the baseline
+        minimum (float): Stages faster than this amount of seconds are never considered regressed
+
+    Returns:
+        list of string: A message for every stage that regressed
+    """
+    regressions = []
+    for name, stages in sorted(results.items()):
+        for stage, seconds in stages.items():
+            previous = baseline.get(name, {}).get(stage)
+            if previous is None or seconds < minimum:
+                continue
+
+            if seconds > previous * (1 + threshold):
+                regressions.append("%s %s regressed from %.4fs to %.4fs (+%.0f%%)" % (
+                    name, stage, previous, seconds, (seconds / previous - 1) * 100))
+
+    return regressions
+
+
+def main():
+    # example run
+    # python -m benchmarks.benchmark -b ./benchmarks/baseline.json
+
+    argParser = argparse.ArgumentParser(
+        description=('Benchmark solving and evaluating recurrence relations'),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    argParser.add_argument('-b', '--baseline', type=str,
+                           dest='baseline', required=False,
+                           help='File with the timings to compare against. Defaults to baseline.json next to this script')
+    argParser.add_argument('-u', '--update', action='store_true',
+                           dest='update', help='Write the timings of this run to the baseline file.')
+    argParser.add_argument('-t', '--threshold', type=float,
+                           dest='threshold', required=False,
+                           help='The fraction a stage may be slower than the baseline before it is a regression. Defaults to 0.25')
+    argParser.add_argument('-m', '--minimum', type=float,
+                           dest='minimum', required=False,
+                           help='Stages faster than this many seconds are never a regression. Defaults to 0.01')
+    argParser.add_argument('-r', '--repeat', type=int,
+                           dest='repeat', required=False,
+                           help='How often every stage is run, the fastest run is used. Defaults to 3')
+    argParser.add_argument('-c', '--count', type=int,
+                           dest='count', required=False,
+                           help='How many values are calculated per evaluation stage. Defaults to 50')
+    argParser.add_argument('names', nargs='*',
+                           help='Only run the relations with these names. Defaults to all')
+
+    args = argParser.parse_args()
+    args.baseline = args.baseline if args.baseline else os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+    args.threshold = args.threshold if args.threshold is not None else 0.25
+    args.minimum = args.minimum if args.minimum is not None else 0.01
+    args.repeat = args.repeat if args.repeat else 3
+    args.count = args.count if args.count else 50
+
+    logging.basicConfig(format='%(message)s', level=logging.WARNING)
+
+    results = runBenchmarks(args.names, args.repeat, args.count)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    if args.update or len(baseline) == 0:
+        baseline.update(results)
+        with open(args.baseline, "w+") as f:
+            json.dump(baseline, f, indent = 2, sort_keys = True)
+        print("Wrote baseline to %s" % args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.minimum)
+    for r in regressions:
+        logging.error(r)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,7 +19,7 @@ setup(
     author_email='rgoemans@science.ru.nl',
     url='https://github.com/rowanG077/RecurrenceRelationSolver',
     license=license,
-    packages=find_packages(exclude=('tests')),
+    packages=find_packages(exclude=('tests', 'benchmarks')),
     entry_points={
         'console_scripts': [
         'recurrenceSolver=RecurrenceRelationSolver.RecurrenceRelationSolver'
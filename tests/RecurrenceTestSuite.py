@@ -3,6 +3,7 @@
 from .context import RecurrenceRelation, RecurrenceRelationParser
 
 import unittest
+from fractions import Fraction
 
 from nose.tools import assert_almost_equal
 
@@ -14,8 +15,12 @@ class RecurrenceTestSuite(unittest.TestCase):
 
     def verify_range(self, relation):
         start = relation.getLowerBoundDomain()
-        for i in range(start, start + 51):
-            iterative_result = relation.calculateValueFromRecurrence(i)
-            solved_result = relation.calculateValueFromSolved(i)
+        exact = relation._getQuadraticEvaluator() is not None
+        for i, value in zip(range(start, start + 51), relation.iterValues(start, start + 51)):
             msg = "Verification of solved recurrence failed at n = %d for relation: %s" % (i, relation.getRecurrence()) 
-            assert_almost_equal(iterative_result, solved_result, 4, msg)
+            if exact and isinstance(value, (int, Fraction)):
+                self.assertEqual(value, relation.calculateExactValueFromSolved(i), msg)
+            else:
+                iterative_result = relation.calculateValueFromRecurrence(i)
+                solved_result = relation.calculateValueFromSolved(i)
+                assert_almost_equal(iterative_result, solved_result, 4, msg)
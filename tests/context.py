@@ -1,2 +1,3 @@
 # -*- coding: utf-8 -*-
-from RecurrenceRelationSolver import RecurrenceRelation, RecurrenceRelationParser
\ No newline at end of file
+from RecurrenceRelationSolver import RecurrenceParseError, RecurrenceRelation, RecurrenceRelationParser, SolveCache, SolveStats
+from RecurrenceRelationSolver.RecurrenceRelationSolver import discoverFiles, solveRelation, solveRelationsParallel
\ No newline at end of file
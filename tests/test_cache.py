@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, SolveCache
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class SolveCacheTestSuite(unittest.TestCase):
+    """Test cases for the persistent cache of closed forms"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_solve_uses_cache(self):
+        cache = SolveCache(self.path)
+        first = RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"})
+        solution = first.solve(cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.close()
+
+        cache = SolveCache(self.path)
+        second = RecurrenceRelation("s(n-2) + s(n-1)", {0: "0", 1: "1"})
+        self.assertEqual(second.solve(cache), solution)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(second._closedForm, first._closedForm)
+
+        other = RecurrenceRelation("s(n-1) + s(n-2)", {0: "1", 1: "1"})
+        other.solve(cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+    def test_pretty_key(self):
+        cache = SolveCache(self.path)
+        RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"}).solve(cache)
+        RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"}).solve(cache, pretty = True)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"}).solve(cache, pretty = True)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        cache.close()
+
+    def test_eviction(self):
+        cache = SolveCache(self.path, 10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        self.assertEqual(cache.get("a"), "12345")
+
+        # Recency doesn't depend on the clock, every access gets its own sequence number
+        accessed = [row[0] for row in cache._getConnection().execute("SELECT accessed FROM closed_forms ORDER BY key")]
+        self.assertEqual(accessed, [3, 2])
+
+        # b is the least recently used entry
+        cache.put("c", "12345")
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), "12345")
+        self.assertEqual(cache.get("c"), "12345")
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, SolveCache, solveRelation, solveRelationsParallel
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class EngineTestSuite(unittest.TestCase):
+    """Test cases for solving with the different engines"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        RecurrenceRelation._engineWins.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        RecurrenceRelation._engineWins.clear()
+
+    def assertSameClosedForms(self, recurrence, initialConditions):
+        characteristic = RecurrenceRelation(recurrence, initialConditions)
+        characteristic.solve(engine = "characteristic")
+        generatingFunction = RecurrenceRelation(recurrence, initialConditions)
+        generatingFunction.solve(engine = "generatingFunction")
+
+        self.assertEqual(characteristic.getSolvingEngine(), "characteristic")
+        self.assertEqual(generatingFunction.getSolvingEngine(), "generatingFunction")
+        difference = characteristic._closedForm - generatingFunction._closedForm
+        self.assertEqual(characteristic._normalizer.normalize(difference), 0, recurrence)
+
+    def test_same_closed_forms(self):
+        self.assertSameClosedForms("s(n-1) + s(n-2)", {0: "0", 1: "1"})
+        self.assertSameClosedForms("8*s(n-2) - 16*s(n-4) + n^4 * 2^n + (-2)^n", {0: "0", 1: "1", 2: "2", 3: "3"})
+        self.assertSameClosedForms("4*s(n-1) - 3*s(n-2) + 2^n + n + 3", {3: "1", 4: "-1/2"})
+
+    def test_generating_function_needs_consecutive_conditions(self):
+        relation = RecurrenceRelation("5*s(n-1) - 6*s(n-2)", {0: "1", 2: "7"})
+        with self.assertRaises(Exception):
+            relation.solve(engine = "generatingFunction")
+
+        # the race falls back to the engine that can solve it
+        relation.solve(engine = "race")
+        self.assertEqual(relation.getSolvingEngine(), "characteristic")
+        self.assertAlmostEqual(relation.calculateValueFromSolved(2), 7, delta = 1e-9)
+
+    def test_race(self):
+        relation = RecurrenceRelation("2*s(n-1) + n + 5", {0: "4"})
+        relation.solve(engine = "race")
+        self.assertIn(relation.getSolvingEngine(), ["characteristic", "generatingFunction"])
+        for i in range(0, 10):
+            self.assertAlmostEqual(relation.calculateValueFromSolved(i), relation.calculateValueFromRecurrence(i), delta = 1e-9)
+
+        rates = RecurrenceRelation.getEngineWinRates()
+        self.assertEqual(list(rates.values()), [{ relation.getSolvingEngine(): 1.0 }])
+
+        with self.assertRaises(ValueError):
+            RecurrenceRelation("2*s(n-1)", {0: "4"}).solve(engine = "fastest")
+
+    def test_default_engine(self):
+        cache = SolveCache(os.path.join(self.directory, "cache.sqlite"))
+        relation = RecurrenceRelation("3*s(n-1) - 2*s(n-2) + 3^n", {0: "1", 1: "2"})
+        shape = relation._getShape()
+
+        relation.solve(cache = cache)
+        self.assertEqual(relation.getSolvingEngine(), "characteristic")
+
+        for _ in range(0, 2):
+            cache.recordWin(shape, "generatingFunction")
+        cache.recordWin(shape, "characteristic")
+        self.assertEqual(cache.getWins(shape), { "generatingFunction": 2, "characteristic": 1 })
+
+        # relations of the same shape use the engine that won most races
+        other = RecurrenceRelation("5*s(n-1) - 6*s(n-2) + 7^n", {1: "2", 2: "5"})
+        self.assertEqual(other._getShape(), shape)
+        other.solve(cache = cache)
+        self.assertEqual(other.getSolvingEngine(), "generatingFunction")
+
+        # The default engine falls back when it can't solve a relation of that shape
+        RecurrenceRelation._engineWins["2:0:-1"] = { "generatingFunction": 3 }
+        relation = RecurrenceRelation("5*s(n-1) - 6*s(n-2)", {0: "1", 2: "7"})
+        self.assertEqual(relation._getDefaultEngine(), "generatingFunction")
+        relation.solve()
+        self.assertEqual(relation.getSolvingEngine(), "characteristic")
+        self.assertAlmostEqual(relation.calculateValueFromSolved(2), 7, delta = 1e-9)
+        cache.close()
+
+    def test_solve_relation(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = s(n-1) + s(n-2),
+            s(0) = 1,
+            s(1) = 1
+            ];
+        """
+        fn, solution, errors, stats = solveRelation("comass07.txt", recurrence, 10, 10**-4, engine = "race")
+        self.assertIsNotNone(solution)
+        self.assertIn(stats["engine"], ["characteristic", "generatingFunction"])
+
+        # The engines race in processes started by the worker process
+        tasks = [("comass07.txt", recurrence, 10, 10**-4, None, False, None, False, "race")]
+        results = list(solveRelationsParallel(tasks, 1, 120))
+        self.assertEqual(results[0][2], [])
+        self.assertIn(results[0][3]["engine"], ["characteristic", "generatingFunction"])
+
+
+if __name__ == '__main__':
+    unittest.main()
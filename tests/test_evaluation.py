@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, RecurrenceRelationParser
+
+import numpy
+import os
+import shutil
+import stat
+import sympy
+import tempfile
+from fractions import Fraction
+import unittest
+import unittest.mock
+
+from RecurrenceRelationSolver.NativeCompiler import NativeCompiler
+
+
+class EvaluationTestSuite(unittest.TestCase):
+    """Test cases for evaluating recurrence relations without solving them"""
+
+    def setUp(self):
+        self.parser = RecurrenceRelationParser()
+
+    def test_companion_matrix_large_n(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = s(n-1)+s(n-2),
+            s(0) = 0,
+            s(1) = 1
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        self.assertEqual(relation.calculateValueFromRecurrence(1000), sympy.fibonacci(1000).evalf(100))
+
+    def test_companion_matrix_non_homogeneous(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 4*s(n-1) - 3*s(n-2) + 2^n + n + 3,
+            s(0) = 1,
+            s(1) = 4
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        self.assertIsNotNone(relation._getCompanionMatrix())
+
+        relation.solve()
+        for i in [2, 3, 17, 250]:
+            exact = relation._closedForm.subs(relation._sympy_context["n"], i)
+            self.assertEqual(relation.calculateValueFromRecurrence(i), exact.evalf(100))
+
+    def test_companion_matrix_unsupported(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = n*s(n-1),
+            s(0) = 1
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        self.assertIsNone(relation._getCompanionMatrix())
+
+    def test_step_function_native_values(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = s(n-1)/2 + n!,
+            s(0) = 1
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+
+        expected = sympy.Integer(1)
+        for i, value in enumerate(relation.iterValues(1, 21), 1):
+            expected = expected / 2 + sympy.factorial(i)
+            self.assertIsInstance(value, (int, Fraction))
+            self.assertEqual(value, expected)
+
+    def test_iter_values_bounded_memory(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 2*s(n-1) + n + 5,
+            s(0) = 4
+            ];
+        """
+        # Checkpoints are off by default, streaming only keeps the newest window
+        relation = self.parser.parse_recurrence(recurrence)
+        self.assertEqual(len(list(relation.iterValues(0, 1000))), 1000)
+        self.assertEqual(relation._checkpoints, {})
+        self.assertEqual(list(relation._solvedValues), [0])
+
+        relation = self.parser.parse_recurrence(recurrence)
+        relation._checkpointInterval = 100
+
+        values = list(relation.iterValues(0, 1000))
+        self.assertEqual(len(values), 1000)
+        self.assertEqual(values[0], 4)
+        for i in range(1, 1000):
+            self.assertEqual(values[i], 2 * values[i - 1] + i + 5)
+
+        # Nothing is memoized, only sparse checkpoints are kept
+        self.assertEqual(list(relation._solvedValues), [0])
+        self.assertEqual(sorted(relation._checkpoints), list(range(100, 1000, 100)))
+
+        # Random access continues from the nearest checkpoint
+        self.assertEqual(relation._nearestStart(950)[0], 900)
+        self.assertEqual(list(relation.iterValues(950, 953)), values[950:953])
+        self.assertEqual(relation.calculateValueFromRecurrence(999), sympy.Integer(values[999]).evalf(100))
+
+    def test_sequential_access_continues(self):
+        relation = RecurrenceRelation("2*s(n-1) - s(n-2) + n", {0: 1, 1: 3}, checkpointInterval = None)
+        expected = list(relation.iterValues(0, 200))
+
+        relation = RecurrenceRelation("2*s(n-1) - s(n-2) + n", {0: 1, 1: 3}, checkpointInterval = None)
+        for i in range(0, 200):
+            self.assertEqual(relation._calculateExactValueFromRecurrence(i), expected[i])
+            # Only the newest window is kept and the next value continues from it
+            if i >= 2:
+                self.assertEqual(relation._cursor, (i, (expected[i], expected[i - 1])))
+                self.assertEqual(relation._nearestStart(i + 1)[0], i)
+        self.assertEqual(list(relation._solvedValues), [0, 1])
+
+    def test_memoize(self):
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"}, memoize = True)
+        relation.calculateValueFromRecurrence(30)
+        self.assertEqual(sorted(relation._solvedValues), list(range(0, 31)))
+        self.assertEqual(relation._solvedValues[30], sympy.fibonacci(30))
+
+    def test_batch_closed_form(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 8*s(n-2) - 16*s(n-4) + (-2)^n,
+            s(0) = 0,
+            s(1) = 1,
+            s(2) = 2,
+            s(3) = 3,
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+
+        floats = relation.calculateValuesFromSolved(range(0, 30))
+        precise = relation.calculateValuesFromSolved(numpy.arange(0, 30), "mpmath", 50)
+        for i in range(0, 30):
+            expected = relation.calculateValueFromSolved(i)
+            self.assertAlmostEqual(floats[i], float(expected), delta = abs(float(expected)) * 1e-12)
+            self.assertAlmostEqual(precise[i], expected, 30)
+
+        self.assertIn("numpy", relation._closedFormFunctions)
+        self.assertIn("mpmath", relation._closedFormFunctions)
+
+    def test_native_closed_form(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 8*s(n-2) - 16*s(n-4) + (-2)^n + n^2,
+            s(0) = 0,
+            s(1) = 1,
+            s(2) = 2,
+            s(3) = 3,
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        expected = relation.calculateValuesFromSolved(range(0, 40))
+
+        directory = tempfile.mkdtemp()
+        try:
+            for compiler in ["cc", "no-such-compiler"]:
+                relation = self.parser.parse_recurrence(recurrence)
+                relation._nativeCompiler = NativeCompiler(directory, compiler)
+                values = relation.calculateValuesFromSolved(numpy.arange(0, 40), "c")
+                self.assertEqual(values.dtype, numpy.float64)
+                numpy.testing.assert_allclose(values, expected, rtol = 1e-12, atol = 1e-9)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertIn("void closed_form(const double *n, double *out, long count)", relation.exportClosedForm("c"))
+        namespace = {}
+        exec(relation.exportClosedForm("python", "f"), namespace)
+        self.assertAlmostEqual(namespace["f"](10), expected[10], delta = abs(expected[10]) * 1e-12)
+
+    @unittest.skipUnless(shutil.which("cc"), "needs a C compiler")
+    def test_native_cache_directory(self):
+        n = sympy.Symbol("n")
+        with unittest.mock.patch.dict(os.environ, { "XDG_CACHE_HOME": "/cache" }):
+            self.assertEqual(NativeCompiler()._directory, os.path.join("/cache", "RecurrenceRelationSolver"))
+
+        parent = tempfile.mkdtemp()
+        try:
+            directory = os.path.join(parent, "cache")
+            compiler = NativeCompiler(directory)
+            source = compiler.getCSource(n**2, n)
+            compiler._build(source, "closed_form")
+            self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+            library, = os.listdir(directory)
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(directory, library)).st_mode), 0o700)
+
+            # Shared objects others can write to are never loaded
+            os.chmod(os.path.join(directory, library), 0o766)
+            with self.assertRaises(OSError):
+                NativeCompiler(directory)._build(source, "closed_form")
+            os.chmod(directory, 0o777)
+            with self.assertRaises(OSError):
+                NativeCompiler(directory)._build(compiler.getCSource(n**3, n), "closed_form")
+        finally:
+            shutil.rmtree(parent)
+
+    def test_adaptive_precision(self):
+        relation = RecurrenceRelation("s(n-1) + 2*s(n-2) + s(n-3)/3 + 2", {0: 0, 1: "1/3", 2: 1})
+        relation.solve()
+        self.assertIsNone(relation._getQuadraticEvaluator())
+
+        # small values stay in float64, large values get just enough digits
+        value, digits = relation.calculateAdaptiveValueFromSolved(10, 1e-4)
+        self.assertIsInstance(value, float)
+        self.assertEqual(digits, 15)
+        value, digits = relation.calculateAdaptiveValueFromSolved(300, 1e-4)
+        self.assertGreater(digits, 93)
+        self.assertLess(digits, 110)
+
+        for n in [10, 80, 300]:
+            exact = Fraction(relation._calculateExactValueFromRecurrence(n))
+            exact = sympy.Rational(exact.numerator, exact.denominator)
+            for side in [relation.calculateAdaptiveValueFromSolved, relation.calculateAdaptiveValueFromRecurrence]:
+                value, digits = side(n, 1e-4)
+                self.assertLess(abs(sympy.Float(value, digits) - exact), 1e-4)
+
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: 0, 1: 1})
+        self.assertEqual(relation.calculateAdaptiveValueFromRecurrence(10, 1e-4), (55.0, 15))
+        self.assertEqual(int(relation.calculateValueFromRecurrence(80, 30)), 23416728348467685)
+
+    def test_batch_initial_conditions(self):
+        relation = RecurrenceRelation("5*s(n-1) - 6*s(n-2) + 7^n", {1: "2", 2: "5"})
+        conditions = numpy.array([[2, 5], [0, 0], [1, -3], [0.5, 7]])
+
+        values = relation.calculateValuesFromInitialConditions(conditions, range(1, 20))
+        self.assertEqual(values.shape, (4, 19))
+        for row, (a, b) in zip(values, conditions):
+            other = relation.withInitialConditions({1: str(a), 2: str(b)})
+            for i, value in enumerate(row, 1):
+                expected = float(other.calculateValueFromRecurrence(i))
+                self.assertAlmostEqual(value, expected, delta = max(abs(expected) * 1e-12, 1e-9))
+
+        closedForm = sympy.sympify(relation.getSymbolicClosedForm().replace("^", "**"))
+        symbols = { str(s): s for s in closedForm.free_symbols }
+        self.assertEqual(sorted(symbols), ["a0", "a1", "n"])
+        self.assertEqual(closedForm.subs({symbols["a0"]: 1, symbols["a1"]: -3, symbols["n"]: 10}).evalf(100),
+                         relation.withInitialConditions({1: "1", 2: "-3"}).calculateValueFromRecurrence(10))
+
+
+    def test_compiled_nonlinear(self):
+        relation = RecurrenceRelation("(37/10)*s(n-1)*(1-s(n-1)) + s(n-2)/(n+1)", {0: "1/2", 1: "1/3"})
+        self.assertIsNotNone(relation._getStepFunction())
+
+        expected = [Fraction(1, 2), Fraction(1, 3)]
+        for i in range(2, 15):
+            expected.append(Fraction(37, 10) * expected[-1] * (1 - expected[-1]) + expected[-2] / (i + 1))
+        exact = list(relation.iterValues(0, 15))
+        self.assertEqual(exact, expected)
+        self.assertEqual(list(relation.calculateValuesFromRecurrence(range(0, 15), "fraction")), expected)
+
+        floats = relation.calculateValuesFromRecurrence(range(0, 15))
+        self.assertEqual(floats.dtype, numpy.float64)
+        numpy.testing.assert_allclose(floats, [float(v) for v in expected], rtol = 1e-9)
+
+        mpfs = relation.calculateValuesFromRecurrence([14, 3], "mpmath", 60)
+        self.assertLess(abs(mpfs[0] - sympy.Rational(expected[14].numerator, expected[14].denominator).evalf(60)), 1e-50)
+
+        # Irrational steps fall back to sympy
+        relation = RecurrenceRelation("sqrt(s(n-1)) + 1", {0: 2})
+        self.assertAlmostEqual(float(relation.calculateValueFromRecurrence(2)), 1 + (1 + 2**0.5)**0.5)
+        self.assertAlmostEqual(relation.calculateValuesFromRecurrence([2])[0], 1 + (1 + 2**0.5)**0.5)
+
+        with self.assertRaises(ValueError):
+            relation.calculateValuesFromRecurrence([2], "float")
+
+        # s(1) isn't defined when the initial conditions aren't consecutive
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: 0, 2: 1})
+        for backend in ["numpy", "mpmath", "fraction"]:
+            with self.assertRaisesRegex(ValueError, "n = 1"):
+                relation.calculateValuesFromRecurrence(range(0, 5), backend)
+
+if __name__ == '__main__':
+    unittest.main()
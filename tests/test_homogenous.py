@@ -4,6 +4,7 @@ from .context import RecurrenceRelation, RecurrenceRelationParser
 
 from .RecurrenceTestSuite import RecurrenceTestSuite
 
+import sympy
 import unittest
 
 
@@ -111,6 +112,20 @@ class HomogeneousTestSuite(RecurrenceTestSuite):
         """
         self.verify_range(self.parser.parse_recurrence(recurrence))
 
+    def test_normalized_closed_form(self):
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"})
+        relation.solve()
+
+        n = relation._sympy_context["n"]
+        root5 = sympy.sqrt(5)
+        expected = root5 / 5 * (sympy.Rational(1, 2) + root5 / 2)**n - root5 / 5 * (sympy.Rational(1, 2) - root5 / 2)**n
+        self.assertEqual(relation._closedForm, expected)
+
+        pretty = RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"})
+        pretty.solve(pretty = True)
+        self.verify_range(pretty)
+        self.assertEqual((pretty._closedForm - expected).simplify(), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
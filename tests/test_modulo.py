@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import unittest
+
+from RecurrenceRelationSolver.ModularRecurrence import ModularRecurrence
+
+
+class ModuloTestSuite(unittest.TestCase):
+    """Test cases for evaluating recurrence relations modulo m at huge indices"""
+
+    def test_kitamasa(self):
+        # s(n) = 2 * s(n-1) + 3 * s(n-2) - s(n-3)
+        recurrence = ModularRecurrence([2, 3, 96], 97)
+        values = [1, 2, 5]
+        for _ in range(3, 200):
+            values.append((2 * values[-1] + 3 * values[-2] - values[-3]) % 97)
+        self.assertEqual([recurrence.valueAt(i, values[:3]) for i in range(0, 200)], values)
+
+        # a first order recurrence has no x in its residues
+        self.assertEqual(ModularRecurrence([3], 1000).valueAt(10, [2]), 2 * 3**10 % 1000)
+
+    def test_fibonacci(self):
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: 0, 1: 1})
+        self.assertEqual(relation.calculateValueModulo(90, 10**9), 2880067194370816120 % 10**9)
+
+        # The pisano period of 10 is 60
+        self.assertEqual(relation.calculateValueModulo(10**18 + 7, 10), relation.calculateValueModulo(7 + (10**18 % 60), 10))
+
+    def test_non_homogeneous(self):
+        relation = RecurrenceRelation("4*s(n-1) - 3*s(n-2) + 2^n + n + 3", {0: 1, 1: "1/2"})
+        m = 10**9 + 7
+        expected = [v.numerator * pow(v.denominator, -1, m) % m if hasattr(v, "denominator") else v % m
+                    for v in relation.iterValues(0, 40)]
+        self.assertEqual([relation.calculateValueModulo(i, m) for i in range(0, 40)], expected)
+
+        # The denominator of s(1) is not invertible modulo an even number
+        with self.assertRaises(ValueError):
+            relation.calculateValueModulo(10**18, 10)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            RecurrenceRelation("s(n-1)^2", {0: 2}).calculateValueModulo(10, 7)
+        with self.assertRaises(ValueError):
+            RecurrenceRelation("s(n-1) + n!", {0: 1}).calculateValueModulo(10, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
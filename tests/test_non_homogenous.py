@@ -164,6 +164,56 @@ class NonHomogeneousTestSuite(RecurrenceTestSuite):
         """
         self.verify_range(self.parser.parse_recurrence(recurrence))
 
+    def test_with_initial_conditions(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 4*s(n-1) - 3*s(n-2) + 2^n + n + 3,
+            s(0) = 1,
+            s(1) = 4
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        self.verify_range(relation)
+
+        for conditions in [{0: "0", 1: "0"}, {0: "5", 1: "-1/2"}, {0: "2", 1: "2"}]:
+            other = relation.withInitialConditions(conditions)
+            self.verify_range(other)
+
+            # the general solution and the inverted system are shared
+            self.assertIs(other._general, relation._general)
+            self.assertEqual(list(other._general["systems"]), [(0, 1)])
+
+            # the closed form is combined from the shared normalized basis terms
+            self.assertIn("collected", other._general)
+            self.assertEqual(other._closedForm, other._normalizer.normalize(other._closedForm))
+
+    def test_budget(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 8*s(n-2) - 16*s(n-4) + n^4 * 2^n,
+            s(0) = 0,
+            s(1) = 1,
+            s(2) = 2,
+            s(3) = 3,
+            ];
+        """
+        unsimplified = self.parser.parse_recurrence(recurrence)
+        unsimplified.solve(budget = 0)
+        self.assertFalse(unsimplified._simplified)
+        self.verify_range(unsimplified)
+
+        background = self.parser.parse_recurrence(recurrence)
+        background.solve(budget = 0, background = True)
+        self.assertTrue(background.waitForSimplification())
+        self.verify_range(background)
+
+        simplified = self.parser.parse_recurrence(recurrence)
+        simplified.solve(budget = 600)
+        self.assertTrue(simplified._simplified)
+        self.assertEqual(simplified._closedForm, background._closedForm)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelationParser, RecurrenceParseError
+
+import sympy
+import unittest
+
+
+class ParserTestSuite(unittest.TestCase):
+    """Test cases for parsing recurrence relations"""
+
+    def setUp(self):
+        self.parser = RecurrenceRelationParser()
+
+    def test_expressions(self):
+        context = {
+            "s": sympy.Function("s"),
+            "n": sympy.Symbol("n", integer = True)
+        }
+        expressions = [
+            "(9/2)*s(n-2) +(3/2)*s(n-3)-5*s(n-4)-3*s(n-5) + (n-5)^2-3*(n-5)+7",
+            "-2*s(n-1)+11*s(n-2)+12*s(n-3)-36*s(n-4) +41^(n-4)+3",
+            "8*s(n-2) - 16*s(n-4) + n^4 * 2^n",
+            "s(n-1) + n!",
+            "2^-1 * -3 ^ 2 + 2**3**2",
+            "sqrt(5)/5 * ((1 + sqrt(5))/2)^n + a0 - 1.5",
+        ]
+        for expr in expressions:
+            parsed = self.parser._expressionParser.parse(expr)
+            self.assertEqual(parsed, sympy.sympify(expr.replace("^", "**"), context), expr)
+
+    def test_parse_recurrence(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 4*s(n-1) - 3*s(n-2) + 2^n + n + 3,
+            s(0) = 1,
+            s(1) = 1/2
+            ];
+        """
+        relation = self.parser.parse_recurrence(recurrence)
+        s = relation._sympy_context["s"]
+        n = relation._sympy_context["n"]
+        self.assertEqual(relation._recurrence, 4*s(n-1) - 3*s(n-2) + 2**n + n + 3)
+        self.assertEqual(relation._initialConditions, {0: 1, 1: sympy.Rational(1, 2)})
+
+    def test_whitespace(self):
+        # Trailing whitespace after the comma and CRLF line endings
+        recurrence = "eqs :=\r\n[\r\ns(n) = s(n-1)+s(n-2), \r\ns(0) = 0 ,\t\r\ns(1) = 1\r\n];\r\n"
+        relation = self.parser.parse_recurrence(recurrence)
+        s = relation._sympy_context["s"]
+        n = relation._sympy_context["n"]
+        self.assertEqual(relation._recurrence, s(n-1) + s(n-2))
+        self.assertEqual(relation._initialConditions, {0: 0, 1: 1})
+
+        # The position of an error still points into the line
+        with self.assertRaises(RecurrenceParseError) as e:
+            self.parser.parse_recurrence("s(n) =  2*s(n-1) + * 3, \r\ns(0) = 1\r\n")
+        self.assertEqual((e.exception.line, e.exception.column), (1, 20))
+
+    def test_error_position(self):
+        recurrence = "eqs :=\n[\ns(n) = 2*s(n-1) + * 3,\ns(0) = 1\n];"
+        with self.assertRaises(RecurrenceParseError) as e:
+            self.parser.parse_recurrence(recurrence)
+        self.assertEqual((e.exception.line, e.exception.column), (3, 19))
+
+        recurrence = "eqs :=\n[\ns(n) = 2*s(n-1),\n  s(0) = (1 + 2\n];"
+        with self.assertRaises(RecurrenceParseError) as e:
+            self.parser.parse_recurrence(recurrence)
+        self.assertEqual((e.exception.line, e.exception.column), (4, 16))
+        self.assertIn("line 4, column 16", str(e.exception))
+
+
+    def test_missing_recurrence(self):
+        for data in ["", "eqs :=\n[\ns(0) = 1,\ns(1) = 2\n];"]:
+            with self.assertRaises(RecurrenceParseError) as e:
+                self.parser.parse_recurrence(data)
+            self.assertIn("No recurrence", str(e.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import sympy
+import unittest
+
+
+class ParticularSolverTestSuite(unittest.TestCase):
+    """Test cases for the particular solution of non homogeneous recurrences"""
+
+    def checkParticular(self, recurrence):
+        relation = RecurrenceRelation(recurrence, {i: "0" for i in range(0, 6)})
+        spec = relation._spec
+        n = relation._sympy_context["n"]
+
+        particular = relation._solveNonHomogeneous(sympy.Integer(0))
+
+        # s(n) - sum_i c_i * s(n-i) has to equal the non homogeneous part
+        lhs = particular - sum(c * particular.subs(n, n - i) for i, c in enumerate(spec.coefficients, 1))
+        self.assertEqual(relation._normalizer.normalize(lhs - spec.nonHomogeneous), 0, recurrence)
+
+    def test_not_a_root(self):
+        self.checkParticular("5*s(n-1) - 6*s(n-2) + 7^n")
+        self.checkParticular("2*s(n-1) + n^3 + 5")
+
+    def test_root(self):
+        self.checkParticular("5*s(n-1) - 6*s(n-2) + n*3^n + 2^n")
+        self.checkParticular("s(n-1) + n^2")
+
+    def test_repeated_root(self):
+        self.checkParticular("8*s(n-2) - 16*s(n-4) + n^4 * 2^n + (-2)^n")
+        self.checkParticular("3*s(n-1) - 3*s(n-2) + s(n-3) + n + 1")
+
+    def test_irrational(self):
+        self.checkParticular("s(n-1) + s(n-2) + n*(1/2 + sqrt(5)/2)^n")
+        self.checkParticular("2*s(n-2) + 3*n*sqrt(3)^n")
+
+    def test_unsupported(self):
+        relation = RecurrenceRelation("s(n-1) + n!", {0: "1"})
+        with self.assertRaises(Exception) as e:
+            relation.solve()
+        self.assertIn("not a sum of terms", str(e.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, solveRelation
+
+import sympy
+import unittest
+import unittest.mock
+
+
+class ProofTestSuite(unittest.TestCase):
+    """Test cases for proving closed forms"""
+
+    def test_proven(self):
+        relations = [
+            ("s(n-1) + s(n-2)", {0: 0, 1: 1}),
+            ("2*s(n-1) + 2*s(n-2) + n*3^n", {0: 1, 1: 2}),
+            ("4*s(n-1) - 3*s(n-2) + 2^n + n + 3", {0: 1, 1: "1/2"}),
+            ("8*s(n-2) - 16*s(n-4) + (-2)^n", {0: 0, 1: 1, 2: 2, 3: 3}),
+            ("s(n-1) + s(n-2)", {0: "sqrt(2)", 1: 1}),
+        ]
+        for recurrence, initialConditions in relations:
+            relation = RecurrenceRelation(recurrence, initialConditions)
+            relation.solve()
+            self.assertIs(relation.proveClosedForm(), True, recurrence)
+
+            # A closed form that is off by a tiny amount is disproven
+            relation._closedForm += sympy.Rational(1, 10**30) * 2**relation._sympy_context["n"]
+            relation._quadraticEvaluator = None
+            self.assertIs(relation.proveClosedForm(), False, recurrence)
+
+    def test_inconclusive(self):
+        # s(1) and s(2) aren't defined by the relation
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: 0, 3: 1})
+        relation.solve()
+        self.assertIsNone(relation.proveClosedForm())
+
+    def test_verify_proof(self):
+        recurrence = "eqs :=\n[\ns(n) = s(n-1) + s(n-2),\ns(0) = 0,\ns(1) = 1\n];"
+        fn, solution, errors, stats = solveRelation("comass01.txt", recurrence, 0, 10**-4, verify = "proof")
+        self.assertEqual(errors, [])
+        self.assertIsNotNone(solution)
+        self.assertEqual(stats["verification"], "proof")
+        self.assertIn("solveTime", stats)
+        self.assertIn("verifyTime", stats)
+
+        # The roots are only known as CRootOf so the initial conditions can't be proven, the values are compared
+        recurrence = "eqs :=\n[\ns(n) = s(n-1) + 2*s(n-2) + s(n-3)/3 + 2,\ns(0) = 0,\ns(1) = 1/3,\ns(2) = 1\n];"
+        fn, solution, errors, stats = solveRelation("comass02.txt", recurrence, 0, 10**-4, verify = "proof")
+        self.assertEqual(errors, [])
+        self.assertEqual(stats["verification"], "numeric")
+
+        # A rejected proof isn't counted as any verification
+        recurrence = "eqs :=\n[\ns(n) = s(n-1) + s(n-2),\ns(0) = 0,\ns(1) = 1\n];"
+        with unittest.mock.patch.object(RecurrenceRelation, "proveClosedForm", return_value = False):
+            fn, solution, errors, stats = solveRelation("comass01.txt", recurrence, 10, 10**-4, verify = "proof")
+        self.assertIsNone(solution)
+        self.assertNotEqual(errors, [])
+        self.assertNotIn("verification", stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
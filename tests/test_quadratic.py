@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import sympy
+from fractions import Fraction
+import unittest
+
+from RecurrenceRelationSolver.QuadraticEvaluator import QuadraticEvaluator
+
+
+class QuadraticEvaluatorTestSuite(unittest.TestCase):
+    """Test cases for evaluating closed forms exactly in quadratic fields"""
+
+    def setUp(self):
+        self.n = sympy.Symbol("n", integer = True)
+
+    def test_fibonacci(self):
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: 0, 1: 1})
+        relation.solve()
+        self.assertIsNotNone(relation._getQuadraticEvaluator())
+
+        expected = list(relation.iterValues(0, 1001))
+        self.assertEqual(relation.calculateExactValueFromSolved(1000), expected[1000])
+        self.assertIsInstance(relation.calculateExactValueFromSolved(1000), int)
+        # F(-n) = (-1)^(n+1) * F(n)
+        self.assertEqual(relation.calculateExactValueFromSolved(-7), 13)
+
+    def test_forms(self):
+        n = self.n
+        # 3^(n/2) is sqrt(3)^n and 2^(-n) is (1/2)^n
+        evaluator = QuadraticEvaluator(3**(n/2) * (sympy.sqrt(3)/6 + sympy.Rational(1, 2)) + n**2 * 2**(-n + 1), n)
+        for i in range(0, 10):
+            expected = (3**sympy.Rational(i, 2) * (sympy.sqrt(3)/6 + sympy.Rational(1, 2)) + i**2 * sympy.Rational(2, 2**i)).expand()
+            value = evaluator.evaluate(i)
+            self.assertEqual(sympy.sympify(value).expand(), expected)
+            if expected.is_Rational:
+                self.assertIsInstance(value, (int, Fraction))
+
+    def test_unsupported(self):
+        n = self.n
+        with self.assertRaises(ValueError):
+            QuadraticEvaluator(sympy.sqrt(2)**n + sympy.sqrt(3)**n, n)
+        with self.assertRaises(ValueError):
+            QuadraticEvaluator(sympy.factorial(n), n)
+        with self.assertRaises(ValueError):
+            QuadraticEvaluator(2**(n**2), n)
+
+
+if __name__ == '__main__':
+    unittest.main()
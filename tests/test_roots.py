@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, RecurrenceRelationParser
+
+import sympy
+import unittest
+
+from RecurrenceRelationSolver.RootFinder import RootFinder
+
+
+class RootFinderTestSuite(unittest.TestCase):
+    """Test cases for finding the roots of characteristic equations"""
+
+    def test_multiplicities(self):
+        finder = RootFinder()
+        # (r - 1)^2 * (r^2 + r - 1)
+        roots = finder.getRealRoots((1, 2, -3, 1))
+        self.assertEqual(roots[1], 2)
+        self.assertEqual(sum(roots.values()), 4)
+
+        # complex roots are left out
+        self.assertEqual(finder.getRealRoots((0, -1)), {})
+
+    def test_without_radicals(self):
+        finder = RootFinder()
+        # r^5 - 6*r^3 + 8*r + 1 is irreducible with five real roots
+        roots = finder.getRealRoots((0, 6, 0, -8, -1))
+        self.assertEqual(len(roots), 5)
+        self.assertTrue(all(isinstance(r, sympy.CRootOf) for r in roots))
+
+        # r^3 - 3*r + 1 only has a radical form with complex intermediate values
+        roots = finder.getRealRoots((0, 3, -1))
+        self.assertEqual(len(roots), 3)
+        self.assertTrue(all(sympy.I not in r.atoms() for r in roots))
+
+    def test_numeric(self):
+        finder = RootFinder(precision = 30)
+        coefficients = (sympy.sqrt(2), 0, -6, 0, 1)
+        roots = finder.getRealRoots(coefficients)
+        r = sympy.Symbol("r")
+        equation = r**5 - sum(c * r**(5 - i) for i, c in enumerate(coefficients, 1))
+        for root in roots:
+            self.assertIsInstance(root, sympy.Float)
+            self.assertLess(abs(equation.subs(r, root)), 1e-20)
+
+    def test_cache(self):
+        finder = RootFinder(size = 2)
+        finder.getRealRoots((1, 1))
+        finder.getRealRoots((2, -1))
+        finder.getRealRoots((1, 1))
+        self.assertEqual((finder.hits, finder.misses), (1, 2))
+
+        # the least recently used equation is evicted
+        finder.getRealRoots((3, -2))
+        finder.getRealRoots((1, 1))
+        finder.getRealRoots((2, -1))
+        self.assertEqual((finder.hits, finder.misses), (2, 4))
+
+    def test_solve_without_radicals(self):
+        recurrence = """
+            eqs :=
+            [
+            s(n) = 6*s(n-2) - 8*s(n-4) - s(n-5) + 3,
+            s(0) = 0,
+            s(1) = 1,
+            s(2) = 2,
+            s(3) = 3,
+            s(4) = 4
+            ];
+        """
+        relation = RecurrenceRelationParser().parse_recurrence(recurrence)
+        relation.solve()
+        for i in range(0, 30):
+            self.assertAlmostEqual(relation.calculateValueFromSolved(i), relation.calculateValueFromRecurrence(i), delta = 1e-30)
+
+        values = relation.calculateValuesFromSolved(range(0, 10))
+        for i in range(0, 10):
+            self.assertAlmostEqual(values[i], float(relation.calculateValueFromRecurrence(i)), delta = 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation, SolveStats, discoverFiles, solveRelation, solveRelationsParallel
+
+import os
+import shutil
+import tempfile
+
+import unittest
+
+
+class SolverTestSuite(unittest.TestCase):
+    """Test cases for solving batches of recurrence relations"""
+
+    def setUp(self):
+        self.recurrence = """
+            eqs :=
+            [
+            s(n) = 2*s(n-1) + n + 5,
+            s(0) = 4
+            ];
+        """
+
+    def test_solve_relation(self):
+        fn, solution, errors, stats = solveRelation("comass01.txt", self.recurrence, 10, 10**-4)
+        self.assertEqual(fn, "comass01.txt")
+        self.assertIsNotNone(solution)
+        self.assertEqual(errors, [])
+
+    def test_parse_error(self):
+        recurrence = "eqs :=\n[\ns(n) = 2*s(n-1) +* 5,\ns(0) = 4\n];"
+        fn, solution, errors, stats = solveRelation("comass02.txt", recurrence, 10, 10**-4)
+        self.assertEqual(fn, "comass02.txt")
+        self.assertIsNone(solution)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("line 3", errors[0])
+
+        # A file with only initial conditions is reported the same way
+        fn, solution, errors, stats = solveRelation("comass03.txt", "eqs :=\n[\ns(0) = 4\n];", 10, 10**-4)
+        self.assertIsNone(solution)
+        self.assertIn("No recurrence", errors[0])
+
+    def test_profile(self):
+        fn, solution, errors, stats = solveRelation("comass01.txt", self.recurrence, 10, 10**-4, profile = True)
+        self.assertIsNotNone(solution)
+
+        profile = stats["profile"]
+        for stage in ["parse", "solve", "roots", "particular", "initialConditions", "simplify", "verify"]:
+            self.assertIn(stage, profile)
+            self.assertGreater(profile[stage]["calls"], 0)
+
+        # the particular solution is exact so only the closed form is simplified
+        self.assertEqual(profile["simplify"]["calls"], 1)
+        self.assertGreaterEqual(profile["solve"]["time"], profile["roots"]["time"])
+        self.assertGreaterEqual(profile["solve"]["peakMemory"], profile["roots"]["peakMemory"])
+
+    def test_profile_aggregate(self):
+        stats = SolveStats()
+        RecurrenceRelation("s(n-1) + s(n-2)", {0: "0", 1: "1"}).solve(stats = stats)
+        RecurrenceRelation("3*s(n-1) - 2*s(n-2)", {0: "1", 1: "2"}).solve(stats = stats)
+
+        self.assertEqual(stats.stages["solve"]["calls"], 2)
+        self.assertEqual(stats.stages["roots"]["calls"], 2)
+        self.assertNotIn("particular", stats.stages)
+        self.assertIn("roots", stats.formatTable())
+
+    def test_profile_nested_peak(self):
+        stats = SolveStats()
+        with stats.stage("outer"):
+            data = bytearray(8 * 1024 * 1024)
+            del data
+            with stats.stage("inner"):
+                pass
+
+        # The outer stage reached its peak before the nested stage started
+        self.assertGreaterEqual(stats.stages["outer"]["peakMemory"], 8 * 1024 * 1024)
+        self.assertLess(stats.stages["inner"]["peakMemory"], 1024 * 1024)
+
+    def test_parallel_isolates_failures(self):
+        tasks = [
+            ("comass01.txt", self.recurrence, 10, 10**-4),
+            ("comass02.txt", "not a recurrence", 10, 10**-4),
+            ("comass03.txt", self.recurrence, 10, 10**-4)
+        ]
+        results = { fn: (solution, errors) for fn, solution, errors, stats in solveRelationsParallel(tasks, 2, 60) }
+
+        self.assertEqual(sorted(results), ["comass01.txt", "comass02.txt", "comass03.txt"])
+        self.assertIsNotNone(results["comass01.txt"][0])
+        self.assertIsNotNone(results["comass03.txt"][0])
+        self.assertIsNone(results["comass02.txt"][0])
+        self.assertNotEqual(results["comass02.txt"][1], [])
+
+    def test_parallel_timeout(self):
+        tasks = [("comass01.txt", self.recurrence, 10, 10**-4)]
+        results = list(solveRelationsParallel(tasks, 1, 0.001))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0][1])
+
+    def test_parallel_budget_pretty(self):
+        # A budgeted pretty simplification runs in a process of its own inside the worker
+        tasks = [("comass01.txt", self.recurrence, 10, 10**-4, None, False, 60, True)]
+        results = list(solveRelationsParallel(tasks, 1, 120))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][2], [])
+        self.assertIsNotNone(results[0][1])
+
+    def test_discover_files(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for path in ["comass01.txt", "comass01-dir.txt", "notes.md", "a/comass02.txt", "a/b/x.rec", "c/comass3.txt"]:
+                os.makedirs(os.path.join(directory, os.path.dirname(path)), exist_ok = True)
+                open(os.path.join(directory, path), "w").close()
+
+            files = discoverFiles(directory, ["comass[0-9][0-9].txt", "a/b/*"], exclude = "-dir.txt")
+            self.assertEqual(next(files), (os.path.join(directory, "comass01.txt"), "comass01.txt"))
+            self.assertEqual([relative for _, relative in files], [os.path.join("a", "comass02.txt"), os.path.join("a", "b", "x.rec")])
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
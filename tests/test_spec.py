@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import sympy
+import unittest
+
+
+class LinearRecurrenceSpecTestSuite(unittest.TestCase):
+    """Test cases for the structured description of linear recurrences"""
+
+    def test_spec(self):
+        relation = RecurrenceRelation("3*s(n-2) - s(n-1)/2 + n^2*2^n + 7 + n!", {0: "1", 1: "2"})
+        spec = relation._spec
+        n = relation._sympy_context["n"]
+
+        self.assertEqual(spec.order, 2)
+        self.assertEqual(spec.coefficients, (sympy.Rational(-1, 2), sympy.Integer(3)))
+        self.assertEqual(spec.nonHomogeneous, n**2 * 2**n + 7 + sympy.factorial(n))
+        self.assertIsNone(spec.terms)
+
+        spec = RecurrenceRelation("2*s(n-3) + 5*n*3^n + 4", {0: "1", 1: "2", 2: "3"})._spec
+        self.assertEqual(spec.order, 3)
+        self.assertEqual(spec.coefficients, (0, 0, 2))
+        self.assertEqual(sorted(spec.terms, key = sympy.default_sort_key), [(1, 0, 4), (3, 1, 5)])
+
+    def test_spec_is_canonical(self):
+        first = RecurrenceRelation("s(n-1) + s(n-2) + n", {0: "0", 1: "1"})
+        second = RecurrenceRelation("n + s(n-2) + s(n-1)", {0: "3", 1: "4"})
+        self.assertEqual(first._spec, second._spec)
+        self.assertEqual(hash(first._spec), hash(second._spec))
+        self.assertEqual(first._spec.key(), second._spec.key())
+        self.assertEqual(len({first._spec, second._spec}), 1)
+
+    def test_not_linear(self):
+        for recurrence in ["s(n-1)^2", "n*s(n-1)", "s(n-1)*s(n-2)", "s(n+1) + s(n-1)"]:
+            self.assertIsNone(RecurrenceRelation(recurrence, {0: "1", 1: "1"})._spec)
+
+
+if __name__ == '__main__':
+    unittest.main()
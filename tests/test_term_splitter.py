@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import sympy
+import unittest
+
+from RecurrenceRelationSolver.TermSplitter import TermSplitter
+
+
+class TermSplitterTestSuite(unittest.TestCase):
+    """Test cases for splitting terms into constant * n^degree * base^n"""
+
+    def setUp(self):
+        self.n = sympy.Symbol("n", integer = True)
+        self.splitter = TermSplitter(self.n)
+
+    def test_split(self):
+        n = self.n
+        self.assertEqual(self.splitter.split(sympy.Integer(7)), (1, 0, 7))
+        self.assertEqual(self.splitter.split(3 * n**2), (1, 2, 3))
+        self.assertEqual(self.splitter.split(5 * n * 2**n), (2, 1, 5))
+
+        # base^(p*n + q) = (base^p)^n * base^q
+        base, degree, constant = self.splitter.split(n * 3**(2*n + 1))
+        self.assertEqual((base, degree, constant), (9, 1, 3))
+        base, degree, constant = self.splitter.split(sympy.sqrt(5) * 3**(n/2))
+        self.assertEqual((base, degree, constant), (sympy.sqrt(3), 0, sympy.sqrt(5)))
+
+    def test_unsupported(self):
+        n = self.n
+        for term in [sympy.factorial(n), 2**(n**2), n**-1, sympy.sqrt(n)]:
+            self.assertIsNone(self.splitter.split(term), term)
+
+    def test_shifted_exponent_proven(self):
+        relation = RecurrenceRelation("2*s(n-1) + 3 * 2^(n-1)", {0: 1})
+        relation.solve()
+        self.assertIs(relation.proveClosedForm(), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from .context import RecurrenceRelation
+
+import sympy
+import unittest
+
+
+class ConfluentVandermondeTestSuite(unittest.TestCase):
+    """Test cases for solving the initial condition system of the general solution"""
+
+    def checkInitialConditions(self, recurrence, initialConditions):
+        relation = RecurrenceRelation(recurrence, initialConditions)
+        closedForm = sympy.sympify(relation.solve().replace("^", "**"))
+        n = [s for s in closedForm.free_symbols if s.name == "n"]
+        for i, v in initialConditions.items():
+            value = closedForm.subs(n[0], i) if n else closedForm
+            self.assertEqual(sympy.expand(sympy.radsimp(value - sympy.sympify(v))), 0, (recurrence, i))
+
+    def test_repeated_roots(self):
+        # roots 2 with multiplicity 3 and -1 with multiplicity 2
+        self.checkInitialConditions("4*s(n-1) - s(n-2) - 10*s(n-3) + 4*s(n-4) + 8*s(n-5) + 7",
+                                    {3: "1", 4: "-2", 5: "3", 6: "1/2", 7: "0"})
+
+    def test_irrational_roots(self):
+        self.checkInitialConditions("s(n-1) + s(n-2) + 3^n", {-2: "1", -1: "1"})
+        self.checkInitialConditions("2*s(n-2) + n", {1: "1", 2: "3"})
+
+    def test_not_consecutive(self):
+        self.checkInitialConditions("5*s(n-1) - 6*s(n-2)", {0: "1", 2: "7"})
+
+    def test_shared_system(self):
+        relation = RecurrenceRelation("s(n-1) + 2*s(n-2) + s(n-3)/3 + 2", {0: "0", 1: "1/3", 2: "1"})
+        relation.solve()
+        system = relation._getInitialConditionSystem((0, 1, 2))
+
+        # Values outside the field of the roots are combined symbolically
+        for initialConditions in [{0: "1", 1: "2", 2: "-5"}, {0: "sqrt(2)", 1: "0", 2: "1"}]:
+            other = relation.withInitialConditions(initialConditions)
+            self.assertIs(other._getInitialConditionSystem((0, 1, 2)), system)
+            other.solve()
+            closedForm = other._closedForm
+            for i, v in initialConditions.items():
+                value = closedForm.subs(other._sympy_context["n"], i) - sympy.sympify(v)
+                self.assertLess(abs(value.evalf(50)), 10**-40, (initialConditions, i))
+
+    def test_symbolic(self):
+        relation = RecurrenceRelation("s(n-1) + s(n-2)", {0: "1", 1: "1"})
+        closedForm = sympy.sympify(relation.getSymbolicClosedForm().replace("^", "**"))
+        a0, a1, n = sympy.symbols("a0 a1 n")
+        self.assertEqual(sympy.expand(sympy.radsimp(closedForm.subs(n, 0))), a0)
+        self.assertEqual(sympy.expand(sympy.radsimp(closedForm.subs(n, 1))), a1)
+
+
+if __name__ == '__main__':
+    unittest.main()